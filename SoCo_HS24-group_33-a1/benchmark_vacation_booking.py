@@ -0,0 +1,557 @@
+from vacation_booking import *
+import os
+import tempfile
+import threading
+import time
+import argparse
+import random
+import tracemalloc
+
+NAME_WIDTH = 50
+SIZE_WIDTH = 12
+TIME_WIDTH = 10
+RATE_WIDTH = 16
+
+GREEN = "\033[32m"
+MAGENTA = "\033[35m"
+RESET = "\033[0m"
+
+DESTINATIONS = ["Maldives", "Macchu Picchu", "Mediterranean", "Japan", "Nepal", "Bali", "Zürich"]
+MUTATIONS = ["missing", "unknown", "type"]
+
+
+def print_results(name: str, size: int, time: float, metrics: dict = None) -> None:
+    """
+    Prints the name, size, elapsed time and throughput of a benchmark as well as any additional metrics it returned.
+
+    Args:
+        name (str): The name of the benchmark.
+        size (int): The number of operations performed by the benchmark.
+        time (float): The elapsed time in seconds.
+        metrics (dict, optional): Additional metrics returned by the benchmark. Defaults to None.
+
+    Returns:
+        None
+    """
+    rate = f"{size / time:,.0f} ops/s" if time > 0 else "-"
+    output = name + " " * (NAME_WIDTH - len(name))
+    output += f"{size:,}" + " " * (SIZE_WIDTH - len(f"{size:,}"))
+    output += GREEN + f"{time:.3f}s" + " " * (TIME_WIDTH - len(f"{time:.3f}s"))
+    output += rate + " " * (RATE_WIDTH - len(rate)) + RESET
+    if metrics:
+        output += ", ".join(f"{key}: {value}" for key, value in metrics.items())
+    print(output)
+
+
+def run_benchmarks(all_benchmarks: list[Callable], size: int) -> None:
+    """
+    Runs each benchmark in the list all_benchmarks with the given size, measures the time taken, and prints
+    the throughput along with any additional metrics the benchmark returns.
+
+    Args:
+        all_benchmarks (list): The list with the benchmark functions.
+        size (int): The number of operations each benchmark should perform.
+
+    Returns:
+        None: it only prints the results of the benchmarks.
+    """
+    print(
+        MAGENTA
+        + "Name"
+        + " " * (NAME_WIDTH - 4)
+        + "Size"
+        + " " * (SIZE_WIDTH - 4)
+        + "Time"
+        + " " * (TIME_WIDTH - 4)
+        + "Throughput"
+        + " " * (RATE_WIDTH - 10)
+        + "Metrics"
+        + RESET
+    )
+    for benchmark in all_benchmarks:
+        clear_bookings()
+        start_time = time.perf_counter()
+        metrics = benchmark(size)
+        elapsed_time = time.perf_counter() - start_time
+        print_results(benchmark.__name__, size, elapsed_time, metrics)
+    clear_bookings()
+
+
+def find_benchmarks(prefix: str = "benchmark_", pattern: str = None) -> list[Callable]:
+    """
+    Finds all benchmark functions whose names start with a given prefix.
+
+    Args:
+        prefix (str): The prefix of the benchmark function names to search for.
+                      Defaults to "benchmark_".
+        pattern (str, optional): Only return benchmarks whose name contains this pattern. Defaults to None.
+
+    Returns:
+        list: A list of benchmark functions that match the given prefix.
+    """
+    benchmarks = []
+    for name, func in globals().items():
+        if name.startswith(prefix) and callable(func):
+            if pattern is None or pattern.lower() in name.lower():
+                benchmarks.append(func)
+    return benchmarks
+
+
+def benchmark_new(size: int) -> None:
+    """
+    Instantiates 'size' BeachResort objects through new() to measure the instantiation throughput.
+    """
+    for i in range(size):
+        new(
+            BeachResort,
+            destination="Maldives",
+            cost_per_day=100 + i % 50,
+            duration_in_days=7,
+            include_surfing=i % 2 == 0,
+        )
+
+
+def benchmark_new_invalid(size: int) -> dict:
+    """
+    Instantiates 'size' AdventureTrip objects with several invalid attributes to measure the cost of reporting validation errors.
+    """
+    errors = 0
+    for _ in range(size):
+        try:
+            new(
+                AdventureTrip,
+                destination="Nigeria",
+                cost_per_day=-1,
+                duration_in_days="4",
+                difficulty_level="medium",
+            )
+        except TypeError:
+            errors += 1
+    return {"errors": errors}
+
+
+def benchmark_new_many(size: int) -> dict:
+    """
+    Instantiates 'size' BeachResort objects through a loop of new() and through a single new_many() call to compare their throughput.
+    """
+    rows = [
+        {"destination": "Maldives", "cost_per_day": 100 + i % 50, "duration_in_days": 7, "include_surfing": i % 2 == 0}
+        for i in range(size)
+    ]
+    start_time = time.perf_counter()
+    for row in rows:
+        new(BeachResort, **row)
+    loop_time = time.perf_counter() - start_time
+    clear_bookings()
+    start_time = time.perf_counter()
+    _, errors = new_many(BeachResort, rows)
+    batch_time = time.perf_counter() - start_time
+    return {
+        "new": f"{size / loop_time:,.0f} ops/s",
+        "new_many": f"{size / batch_time:,.0f} ops/s",
+        "errors": len(errors),
+    }
+
+
+def book_sample_vacations(size: int) -> None:
+    """
+    Books 'size' vacations, cycling through BeachResort, AdventureTrip and LuxuryCruise.
+    """
+    for i in range(size):
+        match i % 3:
+            case 0:
+                new(
+                    BeachResort,
+                    destination="Maldives",
+                    cost_per_day=100 + i % 50,
+                    duration_in_days=7,
+                    include_surfing=i % 2 == 0,
+                )
+            case 1:
+                new(
+                    AdventureTrip,
+                    destination="Macchu Picchu",
+                    cost_per_day=150,
+                    duration_in_days=4 + i % 3,
+                    difficulty_level="easy" if i % 2 == 0 else "hard",
+                )
+            case 2:
+                new(
+                    LuxuryCruise,
+                    destination="Mediterranean",
+                    cost_per_day=100,
+                    duration_in_days=14,
+                    has_private_suite=i % 4 == 0,
+                )
+
+
+def benchmark_summary_calculate_cost(size: int) -> dict:
+    """
+    Books 'size' vacations and measures a VacationBookingSummary cost query over all of them and over a single class.
+    """
+    book_sample_vacations(size)
+    metrics = {}
+    for search_term in ["", "Beach"]:
+        vacation_booking_summary = new(VacationBookingSummary, search_term=search_term)
+        start_time = time.perf_counter()
+        call(vacation_booking_summary, "calculate_cost")
+        metrics[f"query '{search_term}'"] = f"{(time.perf_counter() - start_time) * 1000:.3f}ms"
+    return metrics
+
+
+def benchmark_columnar_cost(size: int) -> dict:
+    """
+    Books 'size' vacations and compares the total cost computed from the columnar booking table with calling calculate_cost on every booking.
+    """
+    book_sample_vacations(size)
+    vacation_booking_summary = new(VacationBookingSummary)
+    start_time = time.perf_counter()
+    columnar_total = call(vacation_booking_summary, "calculate_cost")
+    columnar_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    call_total = sum(call(vacation, "calculate_cost") for vacation in booked_vacations)
+    call_time = time.perf_counter() - start_time
+    return {
+        "columns": f"{columnar_time * 1000:.3f}ms",
+        "call": f"{call_time * 1000:.3f}ms",
+        "equal": columnar_total == call_total,
+    }
+
+
+def benchmark_call_many(size: int) -> dict:
+    """
+    Books 'size' vacations and compares calling calculate_cost on every booking with call() and with call_many().
+    """
+    book_sample_vacations(size)
+    start_time = time.perf_counter()
+    call_results = [call(vacation, "calculate_cost") for vacation in booked_vacations]
+    call_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    call_many_results = call_many(booked_vacations, "calculate_cost")
+    call_many_time = time.perf_counter() - start_time
+    return {
+        "call": f"{call_time * 1000:.3f}ms",
+        "call_many": f"{call_many_time * 1000:.3f}ms",
+        "equal": call_results == call_many_results,
+    }
+
+
+def benchmark_summary_describe_package(size: int) -> dict:
+    """
+    Books 'size' vacations and measures the first and a repeated VacationBookingSummary description, whose per-booking descriptions are memoized.
+    """
+    book_sample_vacations(size)
+    vacation_booking_summary = new(VacationBookingSummary)
+    metrics = {}
+    for query in ["first", "repeated"]:
+        start_time = time.perf_counter()
+        call(vacation_booking_summary, "describe_package")
+        metrics[query] = f"{(time.perf_counter() - start_time) * 1000:.3f}ms"
+    return metrics
+
+
+def benchmark_write_vacation_summary(size: int) -> dict:
+    """
+    Books 'size' vacations and compares the peak memory of building the summary report with describe_package and of streaming it to a file with write_vacation_summary.
+    """
+    book_sample_vacations(size)
+    vacation_booking_summary = new(VacationBookingSummary)
+    tracemalloc.start()
+    report = call(vacation_booking_summary, "describe_package")
+    _, string_peak = tracemalloc.get_traced_memory()
+    del report
+    clear_bookings()  # Drop the descriptions memoized by describe_package
+    book_sample_vacations(size)
+    tracemalloc.reset_peak()
+    current, _ = tracemalloc.get_traced_memory()
+    with open(os.devnull, "w") as file:
+        write_vacation_summary(vacation_booking_summary, file)
+    _, stream_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"describe_package": f"{string_peak / 2**20:.1f}MB", "stream": f"{(stream_peak - current) / 2**20:.1f}MB"}
+
+
+def benchmark_export_load_bookings(size: int) -> dict:
+    """
+    Books 'size' vacations, exports them to CSV and JSON-lines files and loads them back, measuring the throughput of both directions.
+    """
+    metrics = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for file_format in ["csv", "jsonl"]:
+            clear_bookings()
+            book_sample_vacations(size)
+            path = os.path.join(directory, "bookings." + file_format)
+            start_time = time.perf_counter()
+            export_bookings(path)
+            export_time = time.perf_counter() - start_time
+            clear_bookings()
+            start_time = time.perf_counter()
+            load_bookings(path)
+            load_time = time.perf_counter() - start_time
+            metrics[f"{file_format} export"] = f"{size / export_time:,.0f} rows/s"
+            metrics[f"{file_format} load"] = f"{size / load_time:,.0f} rows/s"
+    return metrics
+
+
+def benchmark_concurrent_new(size: int, producers: int = 4) -> dict:
+    """
+    Books 'size' vacations from several producer threads while another thread repeatedly queries VacationBookingSummary, and checks that every booking was recorded.
+    """
+    done = threading.Event()
+    queries = []
+
+    def produce(count: int) -> None:
+        for i in range(count):
+            new(
+                BeachResort,
+                destination="Maldives",
+                cost_per_day=100 + i % 50,
+                duration_in_days=7,
+                include_surfing=i % 2 == 0,
+            )
+
+    def query() -> None:
+        vacation_booking_summary = new(VacationBookingSummary)
+        while not done.is_set():
+            call(vacation_booking_summary, "calculate_cost")
+            queries.append(len(call(vacation_booking_summary, "describe_package")))
+
+    threads = [threading.Thread(target=produce, args=(size // producers,)) for _ in range(producers)]
+    reader = threading.Thread(target=query)
+    reader.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    done.set()
+    reader.join()
+    return {
+        "producers": producers,
+        "queries": len(queries),
+        "consistent": len(booked_vacations) == len(find_bookings("")) == size // producers * producers,
+    }
+
+
+def benchmark_store(size: int) -> dict:
+    """
+    Books 'size' vacations, saves them to a booking store and measures reopening the store and querying its total cost without booking them again.
+    """
+    book_sample_vacations(size)
+    expected = call(new(VacationBookingSummary), "calculate_cost")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bookings.vbs")
+        start_time = time.perf_counter()
+        save_store(path)
+        save_time = time.perf_counter() - start_time
+        clear_bookings()
+        start_time = time.perf_counter()
+        store = open_store(path)
+        open_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        total_cost = call(new(VacationBookingSummary, store=store), "calculate_cost")
+        query_time = time.perf_counter() - start_time
+        close_store(store)
+        file_size = os.path.getsize(path)
+    return {
+        "save": f"{save_time * 1000:.3f}ms",
+        "open": f"{open_time * 1000:.3f}ms",
+        "query": f"{query_time * 1000:.3f}ms",
+        "size": f"{file_size / size:.0f}B/booking",
+        "equal": total_cost == expected,
+    }
+
+
+def benchmark_select_bookings(size: int) -> dict:
+    """
+    Books 'size' vacations with 100 destinations and compares a selective select_bookings query backed by the attribute indexes with filtering all bookings in a loop.
+    """
+    for i in range(size):
+        new(
+            BeachResort,
+            destination=f"Island {i % 100}",
+            cost_per_day=100 + i % 50,
+            duration_in_days=7,
+            include_surfing=i % 2 == 0,
+        )
+    start_time = time.perf_counter()
+    scan = [v for v in booked_vacations if v["destination"] == "Island 7" and 120 <= v["cost_per_day"] <= 130]
+    scan_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    select_bookings(destination="Island 7", cost_per_day=(120, 130))
+    first_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    selected = select_bookings(destination="Island 7", cost_per_day=(120, 130))
+    select_time = time.perf_counter() - start_time
+    return {
+        "scan": f"{scan_time * 1000:.3f}ms",
+        "select (building indexes)": f"{first_time * 1000:.3f}ms",
+        "select": f"{select_time * 1000:.3f}ms",
+        "equal": scan == selected,
+    }
+
+
+def benchmark_memory(size: int) -> dict:
+    """
+    Books 'size' BeachResort vacations with new() and with new_compact() and compares the memory they occupy.
+    """
+    metrics = {}
+    for constructor in [new, new_compact]:
+        clear_bookings()
+        tracemalloc.start()
+        for i in range(size):
+            constructor(
+                BeachResort,
+                destination="Maldives",
+                cost_per_day=100 + i % 50,
+                duration_in_days=7,
+                include_surfing=i % 2 == 0,
+            )
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        metrics[constructor.__name__] = f"{memory / 2**20:.1f}MB ({memory / size:.0f}B/booking)"
+    return metrics
+
+
+def draw_candidate(rng: random.Random) -> any:
+    """
+    Draws a random value of a random type (int, str, bool or float), used to search for values that pass or fail a type rule.
+    """
+    match rng.randrange(4):
+        case 0:
+            return rng.randint(-100, 1000)
+        case 1:
+            return rng.choice(DESTINATIONS)
+        case 2:
+            return rng.random() < 0.5
+        case _:
+            return rng.uniform(0, 1000)
+
+
+def draw_value(rng: random.Random, key: str, rule: any, valid: bool = True) -> any:
+    """
+    Draws a random value for an attribute that passes (or, if 'valid' is False, fails) its type rule. Lists of allowed values are sampled directly,
+    all other rules are checked with compile_checker() against random candidates until one matches.
+
+    Raises:
+        ValueError: If no matching value was found.
+    """
+    if valid and isinstance(rule, list):
+        return rng.choice(rule)
+    check = compile_checker(key, rule)
+    for _ in range(100):
+        value = draw_candidate(rng)
+        if (check(value) is None) == valid:
+            return value
+    raise ValueError(f"No {'valid' if valid else 'invalid'} value found for {key}")
+
+
+def generate_workload(size: int, seed: int = 0, invalid_ratio: float = 0.1) -> Iterator[tuple[dict, dict, type]]:
+    """
+    Generates 'size' random bookings across all classes in 'Bookings', derived from their cached layouts and type dictionaries, so newly registered classes are covered as well.
+    A share of 'invalid_ratio' of the bookings is made invalid by one random mutation: a missing required attribute, an unknown attribute or a value breaking its type rule.
+    The same seed always generates the same workload.
+
+    Yields:
+        tuple[dict, dict, type]: The dictionary (class), the keyword arguments for new() and the exception new() must raise (KeyError or TypeError), or None for a valid booking.
+    """
+    rng = random.Random(seed)
+    classes = [(cls, get_layout(cls)) for cls in Bookings.values()]
+    for _ in range(size):
+        cls, layout = rng.choice(classes)
+        types = layout["_types"]
+        attributes = [key for key, value in layout.items() if not key.startswith("_") and not callable(value)]
+        kwargs = {key: draw_value(rng, key, types[key]) for key in attributes}
+        expected = None
+        if rng.random() < invalid_ratio:
+            key = rng.choice(attributes)
+            match rng.choice(MUTATIONS):
+                case "missing" if layout[key] is None:
+                    del kwargs[key]
+                    expected = KeyError
+                case "type":
+                    kwargs[key] = draw_value(rng, key, types[key], valid=False)
+                    expected = TypeError
+                case _:
+                    kwargs["discount"] = rng.randint(0, 100)
+                    expected = KeyError
+        yield cls, kwargs, expected
+
+
+def check_invariants() -> None:
+    """
+    Checks that the VacationBookingSummary queries agree with the individual bookings: the total cost of all bookings and of each class equals the sum of the individual costs,
+    the description lists every booking in booking order, and aggregate_bookings() counts every booking once.
+
+    Raises:
+        AssertionError: If an invariant does not hold.
+    """
+    costs = {}
+    for vacation in booked_vacations:
+        costs[vacation["_name"]] = costs.get(vacation["_name"], 0) + call(vacation, "calculate_cost")
+    vacation_booking_summary = new(VacationBookingSummary)
+    assert call(vacation_booking_summary, "calculate_cost") == sum(costs.values()), "total cost differs from the individual costs"
+    for name, cost in costs.items():
+        vacation_booking_summary = new(VacationBookingSummary, search_term=name)
+        assert call(vacation_booking_summary, "calculate_cost") == cost, f"total cost of {name} differs from the individual costs"
+    vacation_booking_summary = new(VacationBookingSummary)
+    expected = "\n".join(call(vacation, "describe_package") for vacation in booked_vacations)
+    assert call(vacation_booking_summary, "describe_package") == expected, "description differs from the individual descriptions"
+    groups = aggregate_bookings()
+    assert sum(group["count"] for group in groups.values()) == len(booked_vacations), "aggregate count differs from the number of bookings"
+    assert {name: group["sum"] for name, group in groups.items()} == costs, "aggregate sums differ from the individual costs"
+
+
+def benchmark_fuzz(size: int, seed: int = 0) -> dict:
+    """
+    Runs 'size' randomly generated bookings (see generate_workload()) through new(), call() and VacationBookingSummary,
+    checks that exactly the invalid ones are rejected with the expected error and that the summary invariants hold (see check_invariants()), and measures the throughput of each step.
+    """
+    workload = list(generate_workload(size, seed))
+    mismatches = 0
+    start_time = time.perf_counter()
+    for cls, kwargs, expected in workload:
+        try:
+            new(cls, **kwargs)
+            error = None
+        except (KeyError, TypeError) as exception:
+            error = type(exception)
+        mismatches += error is not expected
+    new_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    call_many(booked_vacations, "calculate_cost")
+    call_many(booked_vacations, "describe_package")
+    call_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    check_invariants()
+    check_time = time.perf_counter() - start_time
+    return {
+        "valid": len(booked_vacations),
+        "invalid": size - len(booked_vacations),
+        "mismatches": mismatches,
+        "new": f"{size / new_time:,.0f} ops/s",
+        "call": f"{2 * len(booked_vacations) / call_time:,.0f} ops/s",
+        "invariants": f"{check_time * 1000:.3f}ms",
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run Benchmarks for VacationBooking")
+    parser.add_argument(
+        "-s",
+        "--select",
+        default=None,
+        help="only run benchmarks with a specific pattern",
+    )
+    parser.add_argument(
+        "-n",
+        "--size",
+        type=int,
+        default=100000,
+        help="number of operations per benchmark",
+    )
+    args = parser.parse_args()
+    benchmarks = find_benchmarks(pattern=args.select)
+    if not benchmarks:
+        print(f"No benchmarks found matching the given pattern '{args.select}'!")
+        exit(1)
+    run_benchmarks(benchmarks, args.size)
@@ -1,17 +1,36 @@
 from vacation_booking import *
+import vacation_booking
+import benchmark_vacation_booking
+import ast
+import hashlib
+import io
+import sys
+import os
+import tempfile
+import threading
 import time
 import argparse
+import json
+import math
+import statistics
 
 NAME_WIDTH = 75
 RESULT_WIDTH = 8
 TIME_WIDTH = 10
+STAT_WIDTH = 12
 
 GREEN = "\033[32m"
 YELLOW = "\033[33m"
 RED = "\033[31m"
 MAGENTA = "\033[35m"
+CYAN = "\033[36m"
 RESET = "\033[0m"
 
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".test_cache.json")
+TRACED_FILES = {
+    os.path.basename(path): path for path in [__file__, vacation_booking.__file__, benchmark_vacation_booking.__file__]
+}
+
 
 def print_results(
     outcome: str, name: str, time: float, exception: Exception = None
@@ -26,8 +45,10 @@ def print_results(
             output += YELLOW + "fail" + " " * (RESULT_WIDTH - 4)
         case "error":
             output += RED + "error" + " " * (RESULT_WIDTH - 5)
+        case "cached":
+            output += CYAN + "cached" + " " * (RESULT_WIDTH - 6)
         case _:
-            raise ValueError("Outcome must be either 'pass', 'fail' or 'error'.")
+            raise ValueError("Outcome must be either 'pass', 'fail', 'error' or 'cached'.")
     output += RESET + f"{time:.3f}s"
     if exception:
         exception_type = type(exception).__name__
@@ -36,13 +57,126 @@ def print_results(
     print(output)
 
 
-def run_tests(all_tests: list[Callable]) -> None:
+def run_test(test: Callable) -> tuple[str, float, Exception]:
+    """
+    Runs a single test on a clean booking state and measures the time taken.
+
+    Args:
+        test (Callable): The test function.
+
+    Returns:
+        tuple: The result ('pass', 'fail' or 'error'), the elapsed time and the raised exception in case of an error.
+    """
+    clear_bookings()
+    start_time = time.perf_counter()
+    exception = None
+    try:
+        test()
+        result = "pass"
+    except AssertionError:
+        result = "fail"
+    except Exception as e:
+        result = "error"
+        exception = e
+    return result, time.perf_counter() - start_time, exception
+
+
+def trace_test(test: Callable) -> tuple[str, float, Exception, list[str]]:
+    """
+    Runs a single test like 'run_test' and records which functions of the traced files (see 'TRACED_FILES') it called, including calls in threads started by the test.
+    Nested functions and lambdas are attributed to the top-level function they are defined in. A profiler that was already installed keeps receiving all events.
+
+    Args:
+        test (Callable): The test function.
+
+    Returns:
+        tuple: The result, the elapsed time and the raised exception (see 'run_test'), and the called functions as sorted 'file:name' strings.
+    """
+    traced = {path: name for name, path in TRACED_FILES.items()}
+    functions = {f"{os.path.basename(__file__)}:{test.__name__}"}
+
+    previous_profile = sys.getprofile()
+    previous_thread_profile = threading.getprofile()
+
+    def profile(frame, event, arg):
+        if event == "call" and frame.f_code.co_filename in traced:
+            functions.add(f"{traced[frame.f_code.co_filename]}:{frame.f_code.co_qualname.split('.')[0]}")
+        if previous_profile is not None:
+            previous_profile(frame, event, arg)
+
+    invalidate_layout()  # Cached layouts and methods would hide the functions computing them
+    threading.setprofile(profile)
+    sys.setprofile(profile)
+    try:
+        result, elapsed_time, exception = run_test(test)
+    finally:
+        sys.setprofile(previous_profile)
+        threading.setprofile(previous_thread_profile)
+    return result, elapsed_time, exception, sorted(functions)
+
+
+def index_source(path: str) -> dict:
+    """
+    Splits the source of a file into its top-level functions and everything else (constants, dictionaries (classes), lambdas and the main block).
+
+    Args:
+        path (str): The path to the source file.
+
+    Returns:
+        dict: The source of each top-level function keyed by its name, and the remaining source under the key ''.
+    """
+    with open(path, "r") as file:
+        source = file.read()
+    lines = source.splitlines(keepends=True)
+    index = {"": ""}
+    for node in ast.parse(source).body:
+        segment = "".join(lines[node.lineno - 1 : node.end_lineno])
+        if isinstance(node, ast.FunctionDef):
+            index[node.name] = segment
+        else:
+            index[""] += segment
+    return index
+
+
+def hash_test(functions: list[str], sources: dict) -> str:
+    """
+    Hashes the current source of the functions a test called together with the remaining source of all traced files,
+    so that the hash changes whenever anything the test depends on changes.
+
+    Args:
+        functions (list[str]): The called functions as recorded by 'trace_test'.
+        sources (dict): The sources of the traced files already indexed by 'index_source', updated in place.
+
+    Returns:
+        str: The hexadecimal SHA-256 hash.
+    """
+    digest = hashlib.sha256()
+    for name, path in sorted(TRACED_FILES.items()):
+        if name not in sources:
+            sources[name] = index_source(path)
+        digest.update(sources[name][""].encode())
+    for function in functions:
+        name, function_name = function.split(":", 1)
+        digest.update(function.encode() + b"\0")
+        if name in sources:
+            digest.update(sources[name].get(function_name, "").encode())
+    return digest.hexdigest()
+
+
+def run_tests(all_tests: list[Callable], jobs: int = 1, cache_file: str = None, force: bool = False) -> None:
     """
     Runs each test in the list all_tests, measures the time taken for each tests, and prints
     the results (pass, fail or error) along with the time taken.
+    With more than one job, the tests are distributed across worker processes, each with its own
+    module state, and the results are printed in the order of all_tests.
+    With a cache file, the functions each test called are recorded (see 'trace_test'), and tests that passed
+    before are skipped as long as the hash of their source and of everything they called is unchanged (see 'hash_test').
 
     Args:
         all_tests (list): The list with the test functions.
+        jobs (int, optional): The number of worker processes. Defaults to 1, which runs the tests in this process.
+        cache_file (str, optional): The path of the JSON file caching the test results. Defaults to None, which runs all tests without caching.
+        force (bool, optional): Run all tests even if their cached result is still valid. Defaults to False.
 
     Returns:
         None: it only prints the results of the tests.
@@ -58,35 +192,139 @@ def run_tests(all_tests: list[Callable]) -> None:
         + "Error"
         + RESET
     )
-    results = {"pass": 0, "fail": 0, "error": 0}
+    results = {"pass": 0, "fail": 0, "error": 0, "cached": 0}
     total_time = 0
+    start_time = time.time()
+    cache = {}
+    sources = {}
+    if cache_file and os.path.exists(cache_file):
+        with open(cache_file, "r") as file:
+            cache = json.load(file)
+    pending = []
     for test in all_tests:
-        global booked_vacations
-        booked_vacations.clear()
-        start_time = time.time()
-        exception = None
-        try:
-            test()
-            results["pass"] += 1
-            result = "pass"
-        except AssertionError:
-            results["fail"] += 1
-            result = "fail"
-        except Exception as e:
-            results["error"] += 1
-            result = f"error"
-            exception = e
-        finally:
-            elapsed_time = time.time() - start_time
-            print_results(result, test.__name__, elapsed_time, exception)
-            total_time += elapsed_time
+        entry = cache.get(test.__name__)
+        if force or not cache_file or entry is None or entry["result"] != "pass":
+            pending.append(test)
+        elif entry["hash"] != hash_test(entry["functions"], sources):
+            pending.append(test)
+    pending_names = {test.__name__ for test in pending}
+    runner = trace_test if cache_file else run_test
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        outcomes = executor.map(runner, pending)
+    else:
+        outcomes = map(runner, pending)
+    for test in all_tests:
+        if test.__name__ not in pending_names:
+            results["cached"] += 1
+            print_results("cached", test.__name__, cache[test.__name__]["time"])
+            continue
+        result, elapsed_time, exception, *functions = next(outcomes)
+        results[result] += 1
+        print_results(result, test.__name__, elapsed_time, exception)
+        total_time += elapsed_time
+        if cache_file:
+            functions = functions[0]
+            cache[test.__name__] = {
+                "result": result,
+                "time": elapsed_time,
+                "functions": functions,
+                "hash": hash_test(functions, sources),
+            }
+    if jobs > 1:
+        executor.shutdown()
+    if cache_file:
+        with open(cache_file, "w") as file:
+            json.dump(cache, file, indent=4)
 
     print(
-        f"\n{MAGENTA}Ran {len(all_tests)} tests in {total_time:.3f}s\n"
-        f"{GREEN}Pass:  {results['pass']}\n"
+        f"\n{MAGENTA}Ran {len(pending)} tests in {total_time:.3f}s"
+        + (f" ({time.time() - start_time:.3f}s on {jobs} jobs)" if jobs > 1 else "")
+        + f"\n{GREEN}Pass:  {results['pass']}\n"
         f"{YELLOW}Fail:  {results['fail']}\n"
         f"{RED}Error: {results['error']}{RESET}"
+        + (f"\n{CYAN}Cached: {results['cached']}{RESET}" if results["cached"] else "")
+    )
+
+
+def benchmark_test(test: Callable, repeat: int, warmup: int) -> dict:
+    """
+    Runs a single test 'warmup' times without measuring and then 'repeat' times on a clean booking state,
+    measuring each run with 'time.perf_counter_ns'. Clearing the bookings is not part of the measurement.
+
+    Args:
+        test (Callable): The test function.
+        repeat (int): The number of measured runs.
+        warmup (int): The number of runs before the measurement.
+
+    Returns:
+        dict: The number of runs, the minimum, median and 95th percentile duration in nanoseconds and the runs per second (based on the median).
+
+    Raises:
+        Exception: Any exception raised by the test.
+    """
+    for _ in range(warmup):
+        clear_bookings()
+        test()
+    durations = []
+    for _ in range(repeat):
+        clear_bookings()
+        start_time = time.perf_counter_ns()
+        test()
+        durations.append(time.perf_counter_ns() - start_time)
+    durations.sort()
+    median = statistics.median(durations)
+    return {
+        "runs": repeat,
+        "min_ns": durations[0],
+        "median_ns": median,
+        "p95_ns": durations[max(0, math.ceil(0.95 * repeat) - 1)],
+        "ops_per_s": 1e9 / median if median else math.inf,
+    }
+
+
+def benchmark_tests(all_tests: list[Callable], repeat: int, warmup: int = 10, output: str = None) -> dict:
+    """
+    Benchmarks each test in the list all_tests (see 'benchmark_test') and prints the minimum, median and 95th percentile
+    duration as well as the runs per second of each test. Tests that fail or raise an error are reported and skipped.
+
+    Args:
+        all_tests (list): The list with the test functions.
+        repeat (int): The number of measured runs per test.
+        warmup (int, optional): The number of runs per test before the measurement. Defaults to 10.
+        output (str, optional): The path of a JSON file to save the results to. Defaults to None.
+
+    Returns:
+        dict: The statistics of each benchmarked test, keyed by its name.
+    """
+    print(
+        MAGENTA
+        + "Name"
+        + " " * (NAME_WIDTH - 4)
+        + "Min".ljust(STAT_WIDTH)
+        + "Median".ljust(STAT_WIDTH)
+        + "P95".ljust(STAT_WIDTH)
+        + "Ops/s"
+        + RESET
     )
+    benchmarks = {}
+    for test in all_tests:
+        output_line = test.__name__ + " " * (NAME_WIDTH - len(test.__name__))
+        try:
+            stats = benchmark_test(test, repeat, warmup)
+        except Exception as e:
+            print(output_line + RED + f"[{type(e).__name__}]: {e}" + RESET)
+            continue
+        benchmarks[test.__name__] = stats
+        for key in ["min_ns", "median_ns", "p95_ns"]:
+            output_line += f"{stats[key] / 1000:.1f}µs".ljust(STAT_WIDTH)
+        print(output_line + GREEN + f"{stats['ops_per_s']:,.0f}" + RESET)
+    if output:
+        with open(output, "w") as file:
+            json.dump({"repeat": repeat, "warmup": warmup, "tests": benchmarks}, file, indent=4)
+    return benchmarks
 
 
 def find_tests(prefix: str = "test_", pattern: str = None) -> list[Callable]:
@@ -541,6 +779,966 @@ def test_call_too_many_arguments():
         pass
 
 
+def test_layout_cached():
+    """
+    Tests the get_layout method for repeated instantiations of BeachResort.
+    This test was chosen to ensure that the class hierarchy is merged only once and that instances do not modify the cached layout.
+    """
+    layout = get_layout(BeachResort)
+    beach_resort = new(
+        BeachResort,
+        destination="Maldives",
+        cost_per_day=100,
+        duration_in_days=7,
+        include_surfing=True,
+    )
+    assert get_layout(BeachResort) is layout
+    assert beach_resort is not layout
+    assert layout["destination"] is None
+
+
+def test_layout_invalidation():
+    """
+    Tests the invalidate_layout method after changing a default attribute of BeachResort.
+    This test was chosen to ensure that changes to a class take effect after its cached layout was invalidated.
+    """
+    get_layout(BeachResort)
+    BeachResort["include_surfing"] = False
+    try:
+        invalidate_layout(BeachResort)
+        beach_resort = new(
+            BeachResort, destination="Maldives", cost_per_day=100, duration_in_days=7
+        )
+        assert beach_resort["include_surfing"] is False
+    finally:
+        BeachResort["include_surfing"] = None
+        invalidate_layout(BeachResort)
+
+
+def test_layout_invalidation_memoized_results():
+    """
+    Tests the call_memoized method and the describe_package method for VacationBookingSummary after replacing the methods of BeachResort and invalidating its layout.
+    This test was chosen to ensure that results memoized before a class was changed are not served afterwards.
+    """
+    beach_resort = new(BeachResort, destination="Maldives", cost_per_day=100, duration_in_days=3, include_surfing=True)
+    vacation_booking_summary = new(VacationBookingSummary, search_term="Beach")
+    call_memoized(beach_resort, "calculate_cost")
+    call(vacation_booking_summary, "describe_package")
+    calculate_cost, describe_package = BeachResort["calculate_cost"], BeachResort["describe_package"]
+    BeachResort["calculate_cost"] = lambda cls: 1
+    BeachResort["describe_package"] = lambda cls: f"Beach Resort in {cls['destination']}"
+    try:
+        invalidate_layout(BeachResort)
+        assert call_memoized(beach_resort, "calculate_cost") == 1
+        assert call(vacation_booking_summary, "describe_package") == "Beach Resort in Maldives"
+    finally:
+        BeachResort["calculate_cost"], BeachResort["describe_package"] = calculate_cost, describe_package
+        invalidate_layout(BeachResort)
+
+
+def test_layout_invalidation_total_cost():
+    """
+    Tests the calculate_cost method for VacationBookingSummary and aggregate_bookings after replacing calculate_cost of BeachResort and invalidating its layout.
+    This test was chosen to ensure that class totals and columnar cost functions computed for the old method are not used afterwards.
+    """
+    new(BeachResort, destination="Maldives", cost_per_day=100, duration_in_days=3, include_surfing=False)
+    new(AdventureTrip, destination="Nepal", cost_per_day=100, duration_in_days=2, difficulty_level="easy")
+    vacation_booking_summary = new(VacationBookingSummary)
+    assert call(vacation_booking_summary, "calculate_cost") == 300 + 200
+    calculate_cost = BeachResort["calculate_cost"]
+    BeachResort["calculate_cost"] = lambda cls: 1
+    try:
+        invalidate_layout(BeachResort)
+        assert call(vacation_booking_summary, "calculate_cost") == 1 + 200
+        new(BeachResort, destination="Bali", cost_per_day=50, duration_in_days=2, include_surfing=False)
+        assert call(vacation_booking_summary, "calculate_cost") == 2 + 200
+        assert aggregate_bookings()["BeachResort"]["sum"] == 2
+    finally:
+        BeachResort["calculate_cost"] = calculate_cost
+        invalidate_layout(BeachResort)
+    assert call(vacation_booking_summary, "calculate_cost") == 300 + 100 + 200
+
+
+def test_instantiation_reports_all_type_errors():
+    """
+    Tests the new method for an AdventureTrip instance with several invalid attributes.
+    This test was chosen to ensure that the compiled validator reports all type errors at once instead of only the first one.
+    """
+    try:
+        adventure_trip = new(
+            AdventureTrip,
+            destination="Nigeria",
+            cost_per_day=-1,
+            duration_in_days="4",
+            difficulty_level="medium",
+        )
+        assert False, "TypeError not raised"
+    except TypeError as e:
+        assert "cost_per_day" in str(e)
+        assert "duration_in_days" in str(e)
+        assert "difficulty_level" in str(e)
+
+
+def test_instantiation_reports_all_key_errors():
+    """
+    Tests the new method for a BeachResort instance that misses a key and has an extra key.
+    This test was chosen to ensure that the compiled validator reports unknown and missing keys together as a KeyError.
+    """
+    try:
+        beach_resort = new(
+            BeachResort,
+            destination="Italy",
+            cost_per_day=50,
+            duration_in_days=5,
+            extra_key="extra",
+        )
+        assert False, "KeyError not raised"
+    except KeyError as e:
+        assert "extra_key" in str(e)
+        assert "include_surfing" in str(e)
+
+
+def test_vacationbookingsummary_calculatecost_search_term_case():
+    """
+    Tests the calculate_cost method for VacationBookingSummary with a lowercase search term "adv".
+    This test was chosen to ensure that the booking index matches class names case-insensitively.
+    """
+    create_sample_vacations()
+    vacation_booking_summary = new(VacationBookingSummary, search_term="adv")
+    actual = call(vacation_booking_summary, "calculate_cost")
+    expected = 150 * 4
+    assert actual == expected
+
+
+def test_vacationbookingsummary_describe_package_booking_order():
+    """
+    Tests the describe_package method for VacationBookingSummary with a search term matching two interleaved classes.
+    This test was chosen to ensure that the booking index returns the descriptions in the order the vacations were booked.
+    """
+    for destination in ["Peru", "Nepal"]:
+        new(
+            AdventureTrip,
+            destination=destination,
+            cost_per_day=100,
+            duration_in_days=3,
+            difficulty_level="easy",
+        )
+        new(
+            LuxuryCruise,
+            destination=destination,
+            cost_per_day=100,
+            duration_in_days=3,
+            has_private_suite=True,
+        )
+    vacation_booking_summary = new(VacationBookingSummary, search_term="u")
+    actual = call(vacation_booking_summary, "describe_package")
+    expected = (
+        "The 3 day long Adventure trip in Peru is considered easy.\n"
+        "The 3 day long Luxury Cruise in Peru does include a private suite.\n"
+        "The 3 day long Adventure trip in Nepal is considered easy.\n"
+        "The 3 day long Luxury Cruise in Nepal does include a private suite."
+    )
+    assert actual == expected
+
+
+def test_vacationbookingsummary_index_after_direct_clear():
+    """
+    Tests the calculate_cost method for VacationBookingSummary after 'booked_vacations' was cleared directly.
+    This test was chosen to ensure that the booking index detects changes that bypass 'new' and 'clear_bookings'.
+    """
+    create_sample_vacations()
+    booked_vacations.clear()
+    new(
+        BeachResort,
+        destination="Cuba",
+        cost_per_day=50,
+        duration_in_days=6,
+        include_surfing=False,
+    )
+    vacation_booking_summary = new(VacationBookingSummary)
+    actual = call(vacation_booking_summary, "calculate_cost")
+    expected = 50 * 6
+    assert actual == expected
+
+
+def test_vacationbookingsummary_calculatecost_columns():
+    """
+    Tests the calculate_cost method for VacationBookingSummary over bookings covering every branch of the cost methods.
+    This test was chosen to ensure that the columnar cost functions compute the same total as calling calculate_cost on every booking.
+    """
+    for days, flag in [(0, True), (3, True), (3, False)]:
+        new(
+            BeachResort,
+            destination="Cuba",
+            cost_per_day=50,
+            duration_in_days=days,
+            include_surfing=flag,
+        )
+        new(
+            AdventureTrip,
+            destination="Peru",
+            cost_per_day=70,
+            duration_in_days=days,
+            difficulty_level="hard" if flag else "easy",
+        )
+        new(
+            LuxuryCruise,
+            destination="Japan",
+            cost_per_day=90,
+            duration_in_days=days,
+            has_private_suite=flag,
+        )
+    vacation_booking_summary = new(VacationBookingSummary)
+    actual = call(vacation_booking_summary, "calculate_cost")
+    expected = sum(call(vacation, "calculate_cost") for vacation in booked_vacations)
+    assert actual == expected
+
+
+def test_compact_instance_call():
+    """
+    Tests the calculate_cost and describe_package methods for a compact LuxuryCruise instance.
+    This test was chosen to ensure that call works on compact records the same way as on dictionaries (objects).
+    """
+    luxury_cruise = new_compact(
+        LuxuryCruise,
+        destination="Japan",
+        cost_per_day=67,
+        duration_in_days=8,
+        has_private_suite=True,
+    )
+    assert not hasattr(luxury_cruise, "__dict__")
+    assert call(luxury_cruise, "calculate_cost") == 67 * 8 * 1.5
+    expected = "The 8 day long Luxury Cruise in Japan does include a private suite."
+    assert call(luxury_cruise, "describe_package") == expected
+
+
+def test_compact_instance_summary():
+    """
+    Tests the calculate_cost method for VacationBookingSummary over compact and dictionary instances.
+    This test was chosen to ensure that compact records are booked like instances created by new.
+    """
+    create_sample_vacations()
+    new_compact(
+        AdventureTrip,
+        destination="Nepal",
+        cost_per_day=100,
+        duration_in_days=10,
+        difficulty_level="hard",
+    )
+    vacation_booking_summary = new(VacationBookingSummary)
+    actual = call(vacation_booking_summary, "calculate_cost")
+    expected = (7 * 100 + 100) + (150 * 4) + (100 * 14) + (100 * 10 * 2)
+    assert actual == expected
+
+
+def test_compact_instance_invalid_method_name():
+    """
+    Tests the call method for a compact BeachResort instance with an invalid method_name.
+    This test was chosen to ensure that compact records raise KeyError for non existing methods like dictionaries (objects).
+    """
+    beach_resort = new_compact(
+        BeachResort,
+        destination="Australia",
+        cost_per_day=65,
+        duration_in_days=6,
+        include_surfing=True,
+    )
+    try:
+        call(beach_resort, "description")
+        assert False, "KeyError not raised for invalid method call"
+    except KeyError:
+        pass
+
+
+def test_call_many():
+    """
+    Tests the call_many method for the calculate_cost method over bookings of different classes.
+    This test was chosen to ensure that call_many returns the same results as call, in the order of the given objects.
+    """
+    create_sample_vacations()
+    actual = call_many(booked_vacations, "calculate_cost")
+    expected = [call(vacation, "calculate_cost") for vacation in booked_vacations]
+    assert actual == expected
+
+
+def test_call_many_unknown_class():
+    """
+    Tests the call_many method for objects of an unknown class defining their own calculate_cost methods, interleaved with bookings of known classes.
+    This test was chosen to ensure that methods found inside objects of unknown classes are not reused for other objects.
+    """
+    create_sample_vacations()
+    first = {"_name": "Unknown", "calculate_cost": lambda cls: 1}
+    second = {"_name": "Unknown", "calculate_cost": lambda cls: 2}
+    objects = [first, booked_vacations[0], second, booked_vacations[1], first]
+    expected = [1, call(booked_vacations[0], "calculate_cost"), 2, call(booked_vacations[1], "calculate_cost"), 1]
+    assert call_many(objects, "calculate_cost") == expected
+
+
+def test_resolve_method():
+    """
+    Tests the resolve_method method for a defined and an undefined method of AdventureTrip.
+    This test was chosen to ensure that methods are resolved on the class and that undefined methods raise a KeyError.
+    """
+    assert resolve_method("AdventureTrip", "describe_package") is describe_package_adventure
+    try:
+        resolve_method("AdventureTrip", "description")
+        assert False, "KeyError not raised for invalid method name"
+    except KeyError:
+        pass
+
+
+def test_set_attr_updates_summary():
+    """
+    Tests the calculate_cost and describe_package methods for VacationBookingSummary after changing a booked AdventureTrip with set_attr.
+    This test was chosen to ensure that memoized results and the booking index are updated when an attribute is set.
+    """
+    create_sample_vacations()
+    vacation_booking_summary = new(VacationBookingSummary, search_term="Adventure")
+    call(vacation_booking_summary, "calculate_cost")
+    call(vacation_booking_summary, "describe_package")
+    set_attr(booked_vacations[1], "difficulty_level", "hard")
+    assert call(vacation_booking_summary, "calculate_cost") == 150 * 4 * 2
+    expected = "The 4 day long Adventure trip in Macchu Picchu is considered hard."
+    assert call(vacation_booking_summary, "describe_package") == expected
+
+
+def test_summary_interleaved_bookings():
+    """
+    Tests the calculate_cost method for VacationBookingSummary while bookings, queries and set_attr calls are interleaved.
+    This test was chosen to ensure that the total cost of each class is kept up to date after it was first queried.
+    """
+    vacation_booking_summary = new(VacationBookingSummary, search_term="")
+    expected = 0
+    for i in range(1, 6):
+        luxury_cruise = new(
+            LuxuryCruise,
+            destination="Japan",
+            cost_per_day=10 * i,
+            duration_in_days=i,
+            has_private_suite=i % 2 == 0,
+        )
+        new(AdventureTrip, destination="Peru", cost_per_day=20, duration_in_days=i, difficulty_level="easy")
+        expected += 10 * i * i * (1.5 if i % 2 == 0 else 1) + 20 * i
+        assert call(vacation_booking_summary, "calculate_cost") == expected
+        set_attr(luxury_cruise, "has_private_suite", True)
+        if i % 2 == 1:
+            expected += 10 * i * i * 0.5
+        assert call(vacation_booking_summary, "calculate_cost") == expected
+    assert call(vacation_booking_summary, "calculate_cost") == sum(call(vacation, "calculate_cost") for vacation in booked_vacations)
+
+
+def test_call_memoized():
+    """
+    Tests the call_memoized method for the describe_package method of a booked BeachResort instance.
+    This test was chosen to ensure that results are remembered until an attribute is changed with set_attr.
+    """
+    beach_resort = new(
+        BeachResort,
+        destination="Australia",
+        cost_per_day=65,
+        duration_in_days=6,
+        include_surfing=True,
+    )
+    first = call_memoized(beach_resort, "describe_package")
+    assert call_memoized(beach_resort, "describe_package") is first
+    set_attr(beach_resort, "include_surfing", False)
+    expected = "The 6 day long Beach Resort vacation in Australia does not include surfing."
+    assert call_memoized(beach_resort, "describe_package") == expected
+
+
+def test_call_memoized_after_direct_clear():
+    """
+    Tests the call_memoized method for a BeachResort instance that was removed by clearing booked_vacations directly.
+    This test was chosen to ensure that results remembered for a booking are not served once it is no longer booked.
+    """
+    beach_resort = new(
+        BeachResort,
+        destination="Australia",
+        cost_per_day=65,
+        duration_in_days=6,
+        include_surfing=True,
+    )
+    call_memoized(beach_resort, "describe_package")
+    booked_vacations.clear()
+    beach_resort["destination"] = "Bali"
+    expected = "The 6 day long Beach Resort vacation in Bali includes surfing."
+    assert call_memoized(beach_resort, "describe_package") == expected
+
+
+def test_call_memoized_set_attr_during_call():
+    """
+    Tests the call_memoized method for a SpaRetreat instance whose describe_package method changes the instance with set_attr while it runs.
+    This test was chosen to ensure that a result computed before a concurrent change of the instance is not remembered.
+    """
+
+    def describe_package_spa_retreat(cls: dict) -> str:
+        description = f"The {cls['duration_in_days']} day long Spa Retreat in {cls['destination']}."
+        if cls["duration_in_days"] == 3:
+            set_attr(cls, "duration_in_days", 4)
+        return description
+
+    spa_retreat_class = {
+        "_parent": VacationPackage,
+        "_name": "SpaRetreat",
+        "calculate_cost": lambda cls: cls["cost_per_day"] * cls["duration_in_days"],
+        "describe_package": describe_package_spa_retreat,
+    }
+    register_class(spa_retreat_class, {})
+    spa_retreat = new(spa_retreat_class, destination="Bali", cost_per_day=80, duration_in_days=3)
+    assert call_memoized(spa_retreat, "describe_package") == "The 3 day long Spa Retreat in Bali."
+    assert call_memoized(spa_retreat, "describe_package") == "The 4 day long Spa Retreat in Bali."
+
+
+def test_set_attr_invalid():
+    """
+    Tests the set_attr method for a LuxuryCruise instance with a value of the wrong type and with a method name.
+    This test was chosen to ensure that set_attr validates attributes like the instantiation.
+    """
+    luxury_cruise = new(
+        LuxuryCruise,
+        destination="Japan",
+        cost_per_day=67,
+        duration_in_days=8,
+        has_private_suite=True,
+    )
+    try:
+        set_attr(luxury_cruise, "has_private_suite", "yes")
+        assert False, "TypeError not raised for invalid type"
+    except TypeError:
+        pass
+    try:
+        set_attr(luxury_cruise, "calculate_cost", lambda cls: 0)
+        assert False, "KeyError not raised for method name"
+    except KeyError:
+        pass
+    assert luxury_cruise["has_private_suite"] is True
+
+
+def test_iter_vacation_summary():
+    """
+    Tests the iter_vacation_summary method for a VacationBookingSummary instance with a search term.
+    This test was chosen to ensure that the descriptions are yielded lazily and match those of describe_package.
+    """
+    create_sample_vacations()
+    vacation_booking_summary = new(VacationBookingSummary, search_term="Resort")
+    descriptions = iter_vacation_summary(vacation_booking_summary)
+    assert not isinstance(descriptions, list)
+    expected = call(vacation_booking_summary, "describe_package").split("\n")
+    assert list(descriptions) == expected
+
+
+def test_write_vacation_summary():
+    """
+    Tests the write_vacation_summary method for a VacationBookingSummary instance with a chunk size smaller than one description.
+    This test was chosen to ensure that the streamed report is written in several chunks and equals the output of describe_package.
+    """
+    create_sample_vacations()
+    vacation_booking_summary = new(VacationBookingSummary)
+    file = io.StringIO()
+    count = write_vacation_summary(vacation_booking_summary, file, chunk_size=10)
+    assert count == 3
+    assert file.getvalue() == call(vacation_booking_summary, "describe_package")
+
+
+def test_new_many_reports_row_errors():
+    """
+    Tests the new_many method for AdventureTrip rows of which some are invalid.
+    This test was chosen to ensure that invalid rows are reported by their index without aborting the batch, while all valid rows are booked.
+    """
+    rows = [
+        {"destination": "Nepal", "cost_per_day": 100, "duration_in_days": 10, "difficulty_level": "hard"},
+        {"destination": "Nigeria", "cost_per_day": -1, "duration_in_days": 4, "difficulty_level": "easy"},
+        {"destination": "Peru", "cost_per_day": 150, "duration_in_days": 4},
+        {"destination": "Iceland", "cost_per_day": 120, "duration_in_days": 5, "difficulty_level": "easy"},
+    ]
+    instances, errors = new_many(AdventureTrip, rows)
+    assert [instance["destination"] for instance in instances] == ["Nepal", "Iceland"]
+    assert booked_vacations == instances
+    assert isinstance(errors[1], TypeError)
+    assert isinstance(errors[2], KeyError)
+    assert len(errors) == 2
+    vacation_booking_summary = new(VacationBookingSummary)
+    assert call(vacation_booking_summary, "calculate_cost") == 100 * 10 * 2 + 120 * 5
+
+
+def test_new_many_non_dict_rows():
+    """
+    Tests the new_many method for BeachResort rows of which some are not dictionaries.
+    This test was chosen to ensure that such rows are reported as a TypeError by their index without aborting the batch.
+    """
+    row = {"destination": "Maldives", "cost_per_day": 100, "duration_in_days": 7, "include_surfing": True}
+    instances, errors = new_many(BeachResort, [None, row, ["Bali", 50]])
+    assert booked_vacations == instances
+    assert [instance["destination"] for instance in instances] == ["Maldives"]
+    assert isinstance(errors[0], TypeError)
+    assert isinstance(errors[2], TypeError)
+    assert len(errors) == 2
+
+
+def test_new_many_columns():
+    """
+    Tests the new_many method for BeachResort attributes given as columns.
+    This test was chosen to ensure that columns are instantiated like rows and equal the instances created by new.
+    """
+    columns = {
+        "destination": ["Maldives", "Australia"],
+        "cost_per_day": [100, 65],
+        "duration_in_days": [7, 6],
+        "include_surfing": [True, False],
+    }
+    instances, errors = new_many(BeachResort, columns)
+    assert not errors
+    expected = new(BeachResort, destination="Australia", cost_per_day=65, duration_in_days=6, include_surfing=False)
+    assert instances[1] == expected
+    assert len(booked_vacations) == 3
+
+
+def test_new_many_columns_different_lengths():
+    """
+    Tests the new_many method for BeachResort attributes given as columns of different lengths.
+    This test was chosen to ensure that rows are not dropped silently when a column is too short, and that nothing is booked.
+    """
+    columns = {
+        "destination": ["Maldives", "Australia"],
+        "cost_per_day": [100, 65],
+        "duration_in_days": [7],
+        "include_surfing": [True, False],
+    }
+    try:
+        new_many(BeachResort, columns)
+        assert False, "ValueError not raised for columns of different lengths"
+    except ValueError:
+        pass
+    assert booked_vacations == []
+
+
+def test_export_load_bookings():
+    """
+    Tests the export_bookings and load_bookings methods for sample vacations in CSV and JSON-lines files.
+    This test was chosen to ensure that exported bookings are loaded back with the same attributes, types and order.
+    """
+    create_sample_vacations()
+    expected = [dict(vacation) for vacation in booked_vacations]
+    with tempfile.TemporaryDirectory() as directory:
+        for filename in ["bookings.csv", "bookings.jsonl"]:
+            path = os.path.join(directory, filename)
+            assert export_bookings(path) == 3
+            clear_bookings()
+            assert load_bookings(path, chunk_size=2) == (3, {})
+            assert booked_vacations == expected
+
+
+def test_load_bookings_reports_row_errors():
+    """
+    Tests the load_bookings method for a CSV file with an unknown type and an invalid attribute.
+    This test was chosen to ensure that invalid rows are reported by their index while all valid rows are booked.
+    """
+    lines = [
+        "type,destination,cost_per_day,duration_in_days,include_surfing,difficulty_level",
+        "BeachResort,Maldives,100,7,True,",
+        "Castle,Scotland,100,7,,",
+        "AdventureTrip,Nigeria,-1,4,,easy",
+        "AdventureTrip,Nepal,100,10,,hard",
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bookings.csv")
+        with open(path, "w") as file:
+            file.write("\n".join(lines))
+        count, errors = load_bookings(path)
+    assert count == 2
+    assert isinstance(errors[1], KeyError)
+    assert isinstance(errors[2], TypeError)
+    assert [vacation["destination"] for vacation in booked_vacations] == ["Maldives", "Nepal"]
+
+
+def test_run_test_outcomes():
+    """
+    Tests the run_test method for a passing, a failing and an erroneous test.
+    This test was chosen to ensure that the outcome reported to the (parallel) runner matches the behavior of each test.
+    """
+
+    def failing_test():
+        assert False
+
+    def erroneous_test():
+        raise KeyError("missing")
+
+    assert run_test(lambda: None)[0] == "pass"
+    assert run_test(failing_test)[0] == "fail"
+    result, _, exception = run_test(erroneous_test)
+    assert result == "error" and isinstance(exception, KeyError)
+
+
+def test_benchmark_test_statistics():
+    """
+    Tests the benchmark_test method for the sample vacations with a few runs.
+    This test was chosen to ensure that the benchmark mode reports ordered statistics for the requested number of runs.
+    """
+    stats = benchmark_test(create_sample_vacations, repeat=20, warmup=2)
+    assert stats["runs"] == 20
+    assert 0 < stats["min_ns"] <= stats["median_ns"] <= stats["p95_ns"]
+    assert stats["ops_per_s"] > 0
+
+
+def test_hash_test_changes():
+    """
+    Tests the hash_test method for a change in a called and in an uncalled function of vacation_booking.
+    This test was chosen to ensure that cached test results are only invalidated by changes to what the test depends on.
+    """
+    functions = ["vacation_booking.py:new", "vacation_booking.py:call"]
+    sources = {}
+    original = hash_test(functions, sources)
+    sources["vacation_booking.py"]["find_bookings"] += "\n    # changed"
+    assert hash_test(functions, sources) == original
+    sources["vacation_booking.py"]["new"] += "\n    # changed"
+    assert hash_test(functions, sources) != original
+
+
+def test_trace_test_threads():
+    """
+    Tests the trace_test method for a test that books a vacation in another thread.
+    This test was chosen to ensure that functions called by worker threads are part of the cached dependencies of a test.
+    """
+
+    def threaded_test():
+        thread = threading.Thread(target=create_sample_vacations)
+        thread.start()
+        thread.join()
+
+    result, _, _, functions = trace_test(threaded_test)
+    assert result == "pass"
+    assert "vacation_booking.py:_index_booking" in functions
+    assert "test_vacation_booking.py:create_sample_vacations" in functions
+
+
+def test_register_class_from_other_module():
+    """
+    Tests the register_class method for a WellnessRetreat class defined outside of vacation_booking.
+    This test was chosen to ensure that registered classes can be instantiated, called and summarized like the built-in classes.
+    """
+    wellness_retreat_class = {
+        "_parent": VacationPackage,
+        "_name": "WellnessRetreat",
+        "calculate_cost": lambda cls: cls["cost_per_day"] * cls["duration_in_days"] + 50,
+        "describe_package": lambda cls: f"The {cls['duration_in_days']} day long Wellness Retreat in {cls['destination']}.",
+    }
+    register_class(wellness_retreat_class, {})
+    wellness_retreat = new(
+        wellness_retreat_class,
+        destination="Bali",
+        cost_per_day=80,
+        duration_in_days=5,
+    )
+    assert find_class("WellnessRetreat") is wellness_retreat_class
+    assert call(wellness_retreat, "calculate_cost") == 80 * 5 + 50
+    vacation_booking_summary = new(VacationBookingSummary, search_term="Wellness")
+    assert call(vacation_booking_summary, "describe_package") == "The 5 day long Wellness Retreat in Bali."
+
+
+def test_unregistered_class():
+    """
+    Tests the new method for a class that was not registered.
+    This test was chosen to ensure that instantiating an unknown class raises a KeyError.
+    """
+    unregistered_class = {"_parent": VacationPackage, "_name": "Unregistered", "calculate_cost": None}
+    try:
+        new(unregistered_class, destination="Nowhere", cost_per_day=1, duration_in_days=1)
+        assert False, "KeyError not raised for unregistered class"
+    except KeyError:
+        pass
+
+
+def test_concurrent_bookings():
+    """
+    Tests the new method for BeachResort instances created by several threads while VacationBookingSummary queries run.
+    This test was chosen to ensure that no booking is lost and that every query sees a consistent total of whole bookings.
+    """
+    totals = []
+
+    def book():
+        for _ in range(500):
+            new(BeachResort, destination="Maldives", cost_per_day=10, duration_in_days=2, include_surfing=False)
+
+    def query():
+        vacation_booking_summary = new(VacationBookingSummary)
+        for _ in range(50):
+            totals.append(call(vacation_booking_summary, "calculate_cost"))
+
+    threads = [threading.Thread(target=book) for _ in range(4)] + [threading.Thread(target=query)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(booked_vacations) == 2000
+    assert all(total % 20 == 0 for total in totals)
+    assert call(new(VacationBookingSummary), "calculate_cost") == 2000 * 20
+    assert len(find_bookings("Beach")) == 2000
+
+
+def test_store_summary():
+    """
+    Tests the calculate_cost and describe_package methods for VacationBookingSummary instances querying a saved and reopened booking store.
+    This test was chosen to ensure that stored bookings are read back with the same costs, attributes and order without booking them again.
+    """
+    create_sample_vacations()
+    new(AdventureTrip, destination="Nepal", cost_per_day=100, duration_in_days=10, difficulty_level="hard")
+    expected_cost = call(new(VacationBookingSummary), "calculate_cost")
+    expected_description = call(new(VacationBookingSummary), "describe_package")
+    expected_adventure_cost = call(new(VacationBookingSummary, search_term="adventure"), "calculate_cost")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bookings.vbs")
+        assert save_store(path) == 4
+        clear_bookings()
+        store = open_store(path)
+        try:
+            vacation_booking_summary = new(VacationBookingSummary, store=store)
+            assert call(vacation_booking_summary, "calculate_cost") == expected_cost
+            assert call(vacation_booking_summary, "describe_package") == expected_description
+            adventure_summary = new(VacationBookingSummary, search_term="adventure", store=store)
+            assert call(adventure_summary, "calculate_cost") == expected_adventure_cost
+            assert booked_vacations == []
+        finally:
+            close_store(store)
+
+
+def test_open_store_invalid_file():
+    """
+    Tests the open_store method for a file that was not written by save_store.
+    This test was chosen to ensure that opening an invalid store raises a ValueError instead of reading garbage.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bookings.csv")
+        with open(path, "w") as file:
+            file.write("type,destination\n")
+        try:
+            open_store(path)
+            assert False, "ValueError not raised for invalid store"
+        except ValueError:
+            pass
+
+
+def test_open_store_truncated_file():
+    """
+    Tests the open_store method for an empty file and for a store that was cut off in the middle.
+    This test was chosen to ensure that truncated stores raise a ValueError instead of a struct or mmap error.
+    """
+    create_sample_vacations()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bookings.vbs")
+        save_store(path)
+        with open(path, "rb") as file:
+            data = file.read()
+        for size in [0, len(data) // 2]:
+            with open(path, "wb") as file:
+                file.write(data[:size])
+            try:
+                open_store(path)
+                assert False, "ValueError not raised for truncated store"
+            except ValueError:
+                pass
+
+
+def test_save_store_invalid_booking():
+    """
+    Tests the save_store method for a booking with a destination and a class with a name that do not fit into the store, over an existing store.
+    This test was chosen to ensure that values are not truncated silently and that a failed save leaves the existing store intact.
+    """
+    create_sample_vacations()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bookings.vbs")
+        assert save_store(path) == 3
+        with open(path, "rb") as file:
+            expected = file.read()
+        name = "Adventure" * 8
+        register_class({"_parent": AdventureTrip, "_name": name}, {})
+        Columns[name] = Columns["AdventureTrip"]
+        try:
+            new(find_class(name), destination="Nepal", cost_per_day=100, duration_in_days=10, difficulty_level="hard")
+            new(AdventureTrip, destination="Nepal" * 13, cost_per_day=100, duration_in_days=10, difficulty_level="hard")
+            for search_term in [name, ""]:
+                try:
+                    save_store(path, search_term)
+                    assert False, "ValueError not raised for a value longer than its field"
+                except ValueError:
+                    pass
+        finally:
+            del Columns[name]
+        with open(path, "rb") as file:
+            assert file.read() == expected
+        assert os.listdir(directory) == ["bookings.vbs"]
+
+
+def test_closed_store():
+    """
+    Tests the calculate_cost and describe_package methods for a VacationBookingSummary querying a booking store that was closed.
+    This test was chosen to ensure that a closed store raises a ValueError instead of reporting no bookings.
+    """
+    create_sample_vacations()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bookings.vbs")
+        save_store(path)
+        store = open_store(path)
+        close_store(store)
+        vacation_booking_summary = new(VacationBookingSummary, store=store)
+        for method_name in ["calculate_cost", "describe_package"]:
+            try:
+                call(vacation_booking_summary, method_name)
+                assert False, "ValueError not raised for closed store"
+            except ValueError:
+                pass
+
+
+def test_select_bookings_predicates():
+    """
+    Tests the select_bookings method with a value, a range and a function as predicates.
+    This test was chosen to ensure that all predicates are combined and the matching bookings are returned in booking order.
+    """
+    create_sample_vacations()
+    new(AdventureTrip, destination="Nepal", cost_per_day=100, duration_in_days=10, difficulty_level="hard")
+    new(BeachResort, destination="Maldives", cost_per_day=200, duration_in_days=3, include_surfing=False)
+    actual = select_bookings(destination="Maldives", cost_per_day=(150, None))
+    assert actual == [booked_vacations[4]]
+    actual = select_bookings(cost_per_day=(None, 100), duration_in_days=lambda days: days >= 7)
+    assert actual == [booked_vacations[0], booked_vacations[2], booked_vacations[3]]
+    assert select_bookings("adventure", cost_per_day=100) == [booked_vacations[3]]
+    assert select_bookings(difficulty_level="hard") == [booked_vacations[3]]
+
+
+def test_select_bookings_index_updates():
+    """
+    Tests the select_bookings method after new bookings and set_attr changes to already indexed attributes.
+    This test was chosen to ensure that the per-attribute indexes stay consistent with the bookings.
+    """
+    create_sample_vacations()
+    assert len(select_bookings(destination="Nepal")) == 0
+    assert len(select_bookings(cost_per_day=(120, 160))) == 1
+    nepal = new(AdventureTrip, destination="Nepal", cost_per_day=130, duration_in_days=10, difficulty_level="hard")
+    assert select_bookings(destination="Nepal") == [nepal]
+    set_attr(nepal, "destination", "Tibet")
+    set_attr(booked_vacations[1], "cost_per_day", 90)
+    assert select_bookings(destination="Nepal") == []
+    assert select_bookings(destination="Tibet") == [nepal]
+    assert select_bookings(cost_per_day=(120, 160)) == [nepal]
+
+
+def test_aggregate_bookings():
+    """
+    Tests the aggregate_bookings method grouped by class and by destination.
+    This test was chosen to ensure that count, sum and avg of calculate_cost are computed per group.
+    """
+    create_sample_vacations()
+    new(BeachResort, destination="Maldives", cost_per_day=50, duration_in_days=2, include_surfing=False)
+    by_class = aggregate_bookings()
+    assert by_class["BeachResort"] == {"count": 2, "sum": 800 + 100, "avg": 450}
+    assert by_class["LuxuryCruise"] == {"count": 1, "sum": 1400, "avg": 1400}
+    by_destination = aggregate_bookings("destination", cost_per_day=(None, 120))
+    assert by_destination == {
+        "Maldives": {"count": 2, "sum": 900, "avg": 450},
+        "Mediterranean": {"count": 1, "sum": 1400, "avg": 1400},
+    }
+
+
+def test_instance_holds_only_own_fields():
+    """
+    Tests the new method for an AdventureTrip instance and the lookup of its methods and types through its class.
+    This test was chosen to ensure that instances do not copy methods or type information, but still behave like the merged class.
+    """
+    adventure_trip = new(
+        AdventureTrip,
+        destination="Nepal",
+        cost_per_day=100,
+        duration_in_days=10,
+        difficulty_level="hard",
+    )
+    assert set(adventure_trip) == {"_name", "destination", "cost_per_day", "duration_in_days", "difficulty_level"}
+    assert get_types(adventure_trip) is get_layout(AdventureTrip)["_types"]
+    assert call(adventure_trip, "calculate_cost") == 100 * 10 * 2
+    set_attr(adventure_trip, "difficulty_level", "easy")
+    assert call(adventure_trip, "calculate_cost") == 100 * 10
+
+
+def test_instantiation_method_override():
+    """
+    Tests the new method for a BeachResort instance that tries to override its calculate_cost method.
+    This test was chosen to ensure that methods are only defined on classes and cannot be replaced per instance.
+    """
+    try:
+        new(
+            BeachResort,
+            destination="Maldives",
+            cost_per_day=100,
+            duration_in_days=2,
+            include_surfing=False,
+            calculate_cost=lambda cls: 0,
+        )
+        assert False, "KeyError not raised for overridden method"
+    except KeyError:
+        pass
+
+
+def test_profiling():
+    """
+    Tests the enable_profiling, get_profile and export_profile methods for a BeachResort instance and its calculate_cost method.
+    This test was chosen to ensure that instantiations and calls are counted per class and method, and that profiling can be turned off again.
+    If profiling was already enabled (see PROFILE_VARIABLE), it is enabled again afterwards and the calls recorded so far are restored.
+    """
+    profiled = bool(vacation_booking._unprofiled)
+    original = vacation_booking._unprofiled.get("new", vacation_booking.new)
+    recorded = {key: list(stats) for key, stats in vacation_booking._profile.items()}
+    disable_profiling()
+    reset_profile()
+    try:
+        enable_profiling()
+        try:
+            beach_resort = vacation_booking.new(
+                BeachResort,
+                destination="Maldives",
+                cost_per_day=100,
+                duration_in_days=7,
+                include_surfing=True,
+            )
+            vacation_booking.call(beach_resort, "calculate_cost")
+            vacation_booking.call(beach_resort, "calculate_cost")
+        finally:
+            disable_profiling()
+        vacation_booking.call(beach_resort, "calculate_cost")
+        calls = {(row["class"], row["operation"]): row["calls"] for row in get_profile()}
+        assert calls[("BeachResort", "new")] == 1
+        assert calls[("BeachResort", "calculate_cost")] == 2
+        assert vacation_booking.new is original
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.json")
+            export_profile(path)
+            with open(path) as file:
+                assert json.load(file) == get_profile()
+        reset_profile()
+        assert get_profile() == []
+    finally:
+        reset_profile()
+        vacation_booking._profile.update(recorded)
+        if profiled:
+            enable_profiling()
+
+
+def test_generated_workload():
+    """
+    Tests the new method and VacationBookingSummary for 500 randomly generated valid and invalid bookings across all booking classes.
+    This test was chosen to ensure that exactly the invalid bookings are rejected with the expected error and that the summary agrees with the individual bookings.
+    """
+    workload = list(benchmark_vacation_booking.generate_workload(500, seed=46, invalid_ratio=0.2))
+    assert workload == list(benchmark_vacation_booking.generate_workload(500, seed=46, invalid_ratio=0.2))
+    assert {expected for _, _, expected in workload} == {None, KeyError, TypeError}
+    for cls, kwargs, expected in workload:
+        try:
+            new(cls, **kwargs)
+            error = None
+        except (KeyError, TypeError) as exception:
+            error = type(exception)
+        assert error is expected, f"{cls['_name']} {kwargs} raised {error} instead of {expected}"
+    assert len(booked_vacations) == sum(expected is None for _, _, expected in workload)
+    benchmark_vacation_booking.check_invariants()
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run Tests for VacationBooking")
     parser.add_argument(
@@ -549,9 +1747,51 @@ if __name__ == "__main__":
         default=None,
         help="only run tests with a specific pattern",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes to run the tests in",
+    )
+    parser.add_argument(
+        "-c",
+        "--cache",
+        action="store_true",
+        help="skip tests whose cached result is still valid, tracing the called functions (adds overhead to the reported times)",
+    )
+    parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help="run all tests even if their cached result is still valid (with --cache)",
+    )
+    parser.add_argument(
+        "-b",
+        "--benchmark",
+        type=int,
+        default=None,
+        metavar="N",
+        help="benchmark each test with N measured runs instead of running it once",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=10,
+        help="number of unmeasured runs per test before benchmarking",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="save the benchmark results to a JSON file",
+    )
     args = parser.parse_args()
     tests = find_tests(pattern=args.select)
     if not tests:
         print(f"No tests found matching the given pattern '{args.select}'!")
         exit(1)
-    run_tests(tests)
+    if args.benchmark:
+        benchmark_tests(tests, args.benchmark, args.warmup, args.output)
+    else:
+        run_tests(tests, args.jobs, CACHE_FILE if args.cache else None, args.force)
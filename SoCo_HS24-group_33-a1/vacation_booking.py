@@ -1,6 +1,40 @@
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator
+from functools import wraps
+from array import array
+from itertools import compress, islice
+from operator import mul
+import heapq
+import bisect
+import threading
+import mmap
+import struct
+import csv
+import json
+import os
+import time
+import atexit
 
 booked_vacations = []  # Keep track of all instanciated vacations
+_lock = threading.RLock()  # Guards 'booked_vacations' and the booking index against concurrent bookings and queries
+_booking_index = {}  # Bookings, their positions in 'booked_vacations', their columns and total cost, keyed by class name
+_indexed_count = 0  # Number of bookings in '_booking_index', used to detect changes made to 'booked_vacations' directly
+_search_terms = {}  # Class names matching a (lowercased) search term
+STORE_MAGIC = b"VBS1"  # Marks a booking store file written by 'save_store'
+STORE_HEADER = struct.Struct("<4sI")  # Magic and number of classes
+STORE_DIRECTORY = struct.Struct("<64sQQ")  # Class name, number of bookings and offset of the block of each class
+NAME_WIDTH = 64  # Bytes reserved for the UTF-8 encoded class name in 'STORE_DIRECTORY'
+DESTINATION_WIDTH = 64  # Bytes reserved for the UTF-8 encoded destination of each stored booking
+
+_registry = {}  # Registered dictionaries (classes) and their type dictionaries, keyed by class name
+_layouts = {}  # Cache of merged dictionaries (classes), keyed by the id of the dictionary (class)
+_methods = {}  # Cache of resolved methods, keyed by class name and method name
+_attribute_indexes = {}  # Positions of the bookings per value of an attribute, built on the first query of the attribute
+
+PROFILE_VARIABLE = "VACATION_BOOKING_PROFILE"  # Enables profiling on import if set, see 'enable_profiling'
+PROFILED_FUNCTIONS = ["new", "new_many", "new_compact", "merge_rec", "call"]  # Functions replaced by 'enable_profiling'
+_profile = {}  # Number of calls and cumulative time in nanoseconds, keyed by class name and operation
+_profile_lock = threading.Lock()  # Guards '_profile' against concurrent updates
+_unprofiled = {}  # Original functions replaced by 'enable_profiling', keyed by function name
 
 
 def calculate_cost_adventure(cls: dict) -> int:
@@ -54,20 +88,40 @@ def describe_package_luxury_cruise(cls: dict) -> str:
     return f"The {duration} day long Luxury Cruise in {destination} does {not_str}include a private suite."
 
 
+def calculate_cost_adventure_columns(columns: dict) -> int:
+    costs = list(map(mul, columns["cost_per_day"], columns["duration_in_days"]))
+    hard_costs = sum(compress(costs, columns["difficulty_level"]))  # "hard" is encoded as 1
+    return sum(costs) + hard_costs
+
+
+def calculate_cost_beach_resort_columns(columns: dict) -> int:
+    costs = sum(map(mul, columns["cost_per_day"], columns["duration_in_days"]))
+    surfing_durations = list(compress(columns["duration_in_days"], columns["include_surfing"]))
+    return costs + 100 * (len(surfing_durations) - surfing_durations.count(0))
+
+
+def calculate_cost_luxury_cruise_columns(columns: dict) -> int:
+    costs = list(map(mul, columns["cost_per_day"], columns["duration_in_days"]))
+    suite_costs = sum(compress(costs, columns["has_private_suite"]))
+    if suite_costs:
+        return sum(costs) - suite_costs + suite_costs * 1.5
+    return sum(costs)
+
+
 def calculate_total_cost(cls: dict) -> int:
+    if cls["store"]:
+        return calculate_store_cost(cls["store"], cls["search_term"])
     total_cost = 0
-    for vacation in booked_vacations:
-        if cls["search_term"].lower() in vacation["_name"].lower():
-            total_cost += call(vacation, "calculate_cost")
+    with _lock:
+        for name in find_classes(cls["search_term"]):
+            total_cost += _class_total_cost(name)
     return total_cost
 
 
 def extract_total_vacation_summary(cls: dict) -> str:
-    vacation_summary = ""
-    for vacation in booked_vacations:
-        if cls["search_term"].lower() in vacation["_name"].lower():
-            vacation_summary += call(vacation, "describe_package") + "\n"
-    return vacation_summary[:-1]
+    if cls["store"]:
+        return "\n".join(iter_vacation_summary(cls))
+    return "\n".join([call_memoized(vacation, "describe_package") for vacation in find_bookings(cls["search_term"])])
 
 
 Class = {"_parent": None, "_name": "Class", "_types": {}}
@@ -112,6 +166,33 @@ VacationBookingSummary = {
     "calculate_cost": calculate_total_cost,
     "describe_package": extract_total_vacation_summary,
     "search_term": "",
+    "store": {},
+}
+
+
+Bookings = {
+    "AdventureTrip": AdventureTrip,
+    "BeachResort": BeachResort,
+    "LuxuryCruise": LuxuryCruise,
+}
+
+
+Columns = {
+    "AdventureTrip": {
+        "calculate_cost": calculate_cost_adventure_columns,
+        "mirrors": calculate_cost_adventure,
+        "columns": {"cost_per_day": "q", "duration_in_days": "q", "difficulty_level": "b"},
+    },
+    "BeachResort": {
+        "calculate_cost": calculate_cost_beach_resort_columns,
+        "mirrors": calculate_cost_beach_resort,
+        "columns": {"cost_per_day": "q", "duration_in_days": "q", "include_surfing": "b"},
+    },
+    "LuxuryCruise": {
+        "calculate_cost": calculate_cost_luxury_cruise_columns,
+        "mirrors": calculate_cost_luxury_cruise,
+        "columns": {"cost_per_day": "q", "duration_in_days": "q", "has_private_suite": "b"},
+    },
 }
 
 
@@ -144,27 +225,54 @@ Type_VacationBookingSummary = {
     "calculate_cost": Callable,
     "describe_package": Callable,
     "search_term": str,
+    "store": dict,
 }
 
 
+def register_class(cls: dict, types: dict) -> dict:
+    """
+    Register a dictionary (class) together with its type dictionary, so that it can be instantiated with 'new' and its methods can be resolved by 'call'.
+    Classes defined in other modules must be registered (after their parent) before their first instantiation. Registering a class again replaces it and invalidates its cached layout.
+
+    Args:
+        cls (dict): The dictionary (class) to register. Its '_name' must be unique.
+        types (dict): The type dictionary of the class, containing only the rules for the keys the class defines (see 'Type_VacationPackage').
+
+    Returns:
+        dict: The registered dictionary (class).
+    """
+    previous = _registry.get(cls["_name"])
+    _registry[cls["_name"]] = (cls, types)
+    if previous is not None:
+        invalidate_layout(previous[0])
+    return cls
+
+
 def find_symtable(cls_name: str) -> dict:
     """
-    Retrieve a dictionary (object) starting with "Type_" from the global symbol table.
+    Retrieve the type dictionary of a registered dictionary (class) (see 'register_class').
 
     Args:
         cls_name (str): The name of the class whose associated types to find.
 
     Returns:
-        dict: The found dictionary (object).
+        dict: The found type dictionary.
 
     Raises:
-        KeyError: If the class whose associated types to find is not found in the global symbol table.
+        KeyError: If no class with that name is registered.
     """
-    type_name = "Type_" + cls_name
-    try:
-        return globals()[type_name]
-    except:
-        raise KeyError(f"Method '{type_name}' was not found")
+    entry = _registry.get(cls_name)
+    if entry is None:
+        raise KeyError(f"Class '{cls_name}' is not registered")
+    return entry[1]
+
+
+register_class(Class, Type_Class)
+register_class(VacationPackage, Type_VacationPackage)
+register_class(AdventureTrip, Type_AdventureTrip)
+register_class(BeachResort, Type_BeachResort)
+register_class(LuxuryCruise, Type_LuxuryCruise)
+register_class(VacationBookingSummary, Type_VacationBookingSummary)
 
 
 def find_cls(cls: dict, method_name: str) -> Callable:
@@ -187,9 +295,56 @@ def find_cls(cls: dict, method_name: str) -> Callable:
         raise KeyError(f"Method '{method_name}' was not found")
 
 
+def find_class(cls_name: str) -> dict:
+    """
+    Retrieve a registered dictionary (class) by its name (see 'register_class').
+
+    Args:
+        cls_name (str): The name of the class to find.
+
+    Returns:
+        dict: The found dictionary (class).
+
+    Raises:
+        KeyError: If no class with that name is registered.
+    """
+    entry = _registry.get(cls_name)
+    if entry is None:
+        raise KeyError(f"Class '{cls_name}' is not registered")
+    return entry[0]
+
+
+def resolve_method(cls_name: str, method_name: str) -> Callable:
+    """
+    Resolve a method of a dictionary (class) by walking up its '_parent' chain and cache the result,
+    so every further lookup of the same method on the same class is a single dictionary access.
+
+    Args:
+        cls_name (str): The name of the class on which to resolve the method.
+        method_name (str): The name of the method to be resolved.
+
+    Returns:
+        Callable: The resolved method.
+
+    Raises:
+        KeyError: If neither the class nor any of its parents define the method.
+    """
+    method = _methods.get((cls_name, method_name))
+    if method is not None:
+        return method
+    cls = find_class(cls_name)
+    while cls is not None:
+        if method_name in cls:
+            method = _methods[(cls_name, method_name)] = cls[method_name]
+            return method
+        cls = cls["_parent"]
+    raise KeyError(f"Method '{method_name}' was not found")
+
+
 def call(cls: dict, method_name: str, *args) -> any:
     """
     Execute the specified method on the given dictionary (object) and return its result.
+    The method is looked up on the class of the object (see 'resolve_method'), so repeated calls skip the search.
 
     Args:
         cls (dict): The dictionary (object) on which to call the method.
@@ -199,72 +354,830 @@ def call(cls: dict, method_name: str, *args) -> any:
     Returns:
         Any: The return value of the executed method.
     """
-    method = find_cls(cls, method_name)
+    method = _methods.get((cls.get("_name"), method_name))
+    if method is None:
+        method = _find_method(cls, method_name)
     return method(cls, *args)
 
 
+def _find_method(cls: dict, method_name: str) -> Callable:
+    """
+    Find a method for the given dictionary (object) on its class, or inside the object itself if its class is unknown (see 'find_cls').
+
+    Args:
+        cls (dict): The dictionary (object) for which to find the method.
+        method_name (str): The name of the method to be found.
+
+    Returns:
+        Callable: The found method.
+
+    Raises:
+        KeyError: If the method is not found.
+    """
+    try:
+        return resolve_method(cls["_name"], method_name)
+    except KeyError:
+        return find_cls(cls, method_name)
+
+
+def call_many(objects: list[dict], method_name: str, *args) -> list:
+    """
+    Execute the specified method on each of the given dictionaries (objects) and return their results.
+    The method is resolved only once per class (see 'resolve_method') instead of once per object, even if the objects of different classes are interleaved.
+
+    Args:
+        objects (list[dict]): The dictionaries (objects) on which to call the method.
+        method_name (str): The name of the method to be called.
+        *args: Additional arguments to pass to the method.
+
+    Returns:
+        list: The return values of the executed method, in the order of 'objects'.
+
+    Raises:
+        KeyError: If the method is not found for one of the objects.
+    """
+    results = []
+    methods = {}
+    for obj in objects:
+        name = obj.get("_name")
+        method = methods.get(name)
+        if method is None:
+            try:
+                method = methods[name] = resolve_method(name, method_name)
+            except KeyError:
+                method = find_cls(obj, method_name)  # Objects of unknown classes may define their own methods
+        results.append(method(obj, *args))
+    return results
+
+
+def call_memoized(cls: dict, method_name: str, remember: bool = True) -> any:
+    """
+    Execute the specified method on the given dictionary (object) like 'call', but remember the result if the object is booked.
+    Further calls return the remembered result until an attribute of the object is changed with 'set_attr' or its class is changed and 'invalidate_layout' is called.
+    Results are kept per row in the booking index entry of the class (see '_find_row') and only allocated once a result is remembered.
+    The method runs without holding '_lock', so a result is only remembered if neither 'set_attr' nor 'invalidate_layout' changed the object in the meantime
+    (checked with the version of its row and the generation of its class entry).
+
+    Args:
+        cls (dict): The dictionary (object) on which to call the method.
+        method_name (str): The name of the method to be called.
+        remember (bool, optional): Whether to remember a newly computed result. Defaults to True.
+
+    Returns:
+        Any: The (possibly remembered) return value of the executed method.
+    """
+    with _lock:
+        entry, row = _find_row(cls)
+        if entry is None:
+            return call(cls, method_name)
+        results = entry["results"].get(row)
+        if results is not None and method_name in results:
+            return results[method_name]
+        version = (entry["generation"], entry["versions"].get(row, 0))
+    result = call(cls, method_name)
+    if remember:
+        with _lock:
+            if (entry["generation"], entry["versions"].get(row, 0)) == version:
+                entry["results"].setdefault(row, {})[method_name] = result
+    return result
+
+
+def _find_row(vacation: dict) -> tuple[dict, int]:
+    """
+    Find the booking index entry of the class of a booked vacation and its row in that entry. Must be called while holding '_lock'.
+    The rows are looked up in a map from the ids of the bookings to their rows, which is only built on the first lookup in a class.
+    Since ids of removed objects can be reused, the booking in the found row is checked to be the vacation itself.
+
+    Args:
+        vacation (dict): The dictionary (object) to look up.
+
+    Returns:
+        tuple[dict, int]: The booking index entry and the row, or (None, None) if the vacation is not booked.
+    """
+    _sync_index()
+    entry = _booking_index.get(vacation.get("_name"))
+    if entry is None:
+        return None, None
+    rows = entry["rows"]
+    if rows is None:
+        rows = entry["rows"] = {id(booking): row for row, booking in enumerate(entry["bookings"])}
+    row = rows.get(id(vacation))
+    if row is None or entry["bookings"][row] is not vacation:
+        return None, None
+    return entry, row
+
+
+def set_attr(cls: dict, key: str, value: any) -> None:
+    """
+    Set an attribute of a dictionary (object) after validating it against the type definition of its class.
+    If the object is booked, its memoized method results (see 'call_memoized') are dropped and the booking index is updated,
+    so this is the only way to change a booked vacation.
+
+    Args:
+        cls (dict): The dictionary (object) whose attribute to set.
+        key (str): The name of the attribute.
+        value (any): The new value of the attribute.
+
+    Returns:
+        None
+
+    Raises:
+        KeyError: If the object has no attribute with that name or it has no type definition.
+        TypeError: If the value does not match the expected type.
+    """
+    types = get_types(cls)
+    if key.startswith("_") or key not in cls or callable(cls[key]) or key not in types:
+        raise KeyError(f"{key} is not a valid attribute of {cls['_name']}")
+    error = compile_checker(key, types[key])(value)
+    if error is not None:
+        raise TypeError(error)
+    with _lock:
+        entry, row = _find_row(cls)
+        previous_cost = None
+        if entry is not None and entry["total_cost"] is not None:
+            previous_cost = call(cls, "calculate_cost")
+        previous = cls[key]
+        if isinstance(cls, dict):
+            cls[key] = value
+        else:
+            setattr(cls, key, value)
+        if entry is None:
+            return
+        entry["results"].pop(row, None)
+        entry["versions"][row] = entry["versions"].get(row, 0) + 1
+        if previous_cost is not None:
+            entry["total_cost"] += call(cls, "calculate_cost") - previous_cost
+        index = _attribute_indexes.get(key)
+        if index is not None:
+            position = entry["positions"][row]
+            index["values"][previous].remove(position)
+            bisect.insort(index["values"].setdefault(value, []), position)
+            index["sorted"] = None
+        if entry["columns"] is not None and key in entry["columns"]:
+            try:
+                entry["columns"][key][row] = _encode(cls, key, types)
+            except (OverflowError, TypeError):
+                entry["columns"] = None
+
+
 def merge_rec(cls: dict) -> dict:
     """
     Recursively merge the methods and attributes of a dictionary (class) with those of its parent.
-    Additionally, update the '_types' key with type information from the symbol table based on the class name.
+    Additionally, merge the '_types' key with the type dictionary the class was registered with (see 'register_class').
 
     Args:
         cls (dict): The dictionary (class) to be instantiated.
-        symbol_table (Callable): A function that returns a symbol table dictionary ('globals', 'locals').
 
     Returns:
         dict: The newly instantiated dictionary (object) with merged attributes, methods and type information.
+
+    Raises:
+        KeyError: If the class or one of its parents is not registered.
     """
     result = {}
     if "_parent" in cls and cls["_parent"] is not None:
         result.update(merge_rec(cls["_parent"]))
     result.update(cls)
-    _type = find_symtable(result["_name"])
-    result["_types"].update(_type)
+    registered, _type = _registry.get(cls["_name"], (None, None))
+    if registered is not cls:
+        raise KeyError(f"Class '{cls['_name']}' is not registered")
+    result["_types"] = {**result["_types"], **_type}
     del result["_parent"]
     return result
 
 
-def is_valid_kwarg(cls: dict, kwargs: dict, key: str) -> bool:
+def get_layout(cls: dict) -> dict:
+    """
+    Retrieve the merged layout of a dictionary (class), i.e. all methods, attributes and type information of the class and all its parents.
+    The layout is computed once by 'merge_rec' and cached afterwards, so it must never be modified directly.
+
+    Args:
+        cls (dict): The dictionary (class) whose layout to retrieve.
+
+    Returns:
+        dict: The cached layout of the dictionary (class).
+    """
+    return _get_entry(cls)[1]
+
+
+def get_validator(cls: dict) -> Callable:
+    """
+    Retrieve the validator of a dictionary (class) compiled by 'compile_validator'. It is cached together with the layout of the class.
+
+    Args:
+        cls (dict): The dictionary (class) whose validator to retrieve.
+
+    Returns:
+        Callable: The function validating keyword arguments for the dictionary (class).
+    """
+    return _get_entry(cls)[2]
+
+
+def _get_entry(cls: dict) -> tuple:
+    """
+    Retrieve the cache entry of a dictionary (class), computing it on first use.
+
+    Args:
+        cls (dict): The dictionary (class) whose cache entry to retrieve.
+
+    Returns:
+        tuple: The dictionary (class) itself, its merged layout, its compiled validator, its compact record type and its instance template.
+    """
+    entry = _layouts.get(id(cls))
+    if entry is None:
+        layout = merge_rec(cls)
+        record_type = build_record_type(layout)
+        template = {"_name": layout["_name"], **{key: layout[key] for key in record_type.__slots__}}
+        entry = _layouts[id(cls)] = (cls, layout, compile_validator(layout), record_type, template)
+    return entry
+
+
+def get_types(obj: dict) -> dict:
+    """
+    Retrieve the merged type dictionary of a dictionary (object). Objects created by 'new' only hold their own attributes,
+    so their types are looked up in the cached layout of their class (see 'get_layout') instead of being copied into every object.
+
+    Args:
+        obj (dict): The dictionary (object) or compact record whose type dictionary to retrieve.
+
+    Returns:
+        dict: The merged type dictionary of the class of the object.
+
+    Raises:
+        KeyError: If the class of the object is not registered.
+    """
+    if "_types" in obj:
+        return obj["_types"]
+    return get_layout(find_class(obj["_name"]))["_types"]
+
+
+def invalidate_layout(cls: dict = None) -> None:
+    """
+    Remove cached layouts so that changes to a dictionary (class) or its type dictionary take effect on the next instantiation.
+    The layouts of all dictionaries (classes) inheriting from 'cls' are removed as well, and all resolved methods are resolved again on their next call.
+    The results memoized by 'call_memoized' for the bookings of these classes and their total costs are dropped, since their methods may have changed.
+
+    Args:
+        cls (dict, optional): The changed dictionary (class). Defaults to None, which removes all cached layouts.
+
+    Returns:
+        None
+    """
+    _methods.clear()
+    with _lock:
+        for name, entry in _booking_index.items():
+            registered = _registry.get(name)
+            if cls is None or registered is None or _inherits(registered[0], cls):
+                entry["results"].clear()
+                entry["generation"] += 1
+                entry["total_cost"] = None
+    if cls is None:
+        _layouts.clear()
+        return
+    for key, (cached_cls, *_) in list(_layouts.items()):
+        if _inherits(cached_cls, cls):
+            del _layouts[key]
+
+
+def _inherits(cls: dict, parent: dict) -> bool:
+    """
+    Check whether a dictionary (class) is the given parent or inherits from it through its '_parent' chain.
+
+    Args:
+        cls (dict): The dictionary (class) to check.
+        parent (dict): The possible parent dictionary (class).
+
+    Returns:
+        bool: True if 'parent' is 'cls' or one of its ancestors, False otherwise.
+    """
+    while cls is not None:
+        if cls is parent:
+            return True
+        cls = cls.get("_parent")
+    return False
+
+
+def get_record_type(cls: dict) -> type:
+    """
+    Retrieve the compact record type of a dictionary (class) built by 'build_record_type'. It is cached together with the layout of the class.
+
+    Args:
+        cls (dict): The dictionary (class) whose record type to retrieve.
+
+    Returns:
+        type: The record type used by 'new_compact' for the dictionary (class).
+    """
+    return _get_entry(cls)[3]
+
+
+def build_record_type(layout: dict) -> type:
     """
-    Checks whether the given key in the provided keyword arguments 'kwargs' is valid based on the rules defined in the '_types' dictionary of the provided dictionary (class) 'cls'.
+    Build a compact record type for a merged dictionary (class). Methods and type information are stored once on the record type,
+    while each record only holds the values of its attributes in '__slots__'. Records support the same item access as dictionaries (objects),
+    so 'call' and all methods work on them unchanged.
 
     Args:
-        cls (dict): The before instantiated dictionary (class) 'cls'.
-        kwargs (dict): A dictionary containing keyword arguments to validate.
-        key (str): A single key from the before instantiated dictionary (class) 'cls'.
+        layout (dict): The merged dictionary (class), as returned by 'merge_rec'.
 
     Returns:
-        bool: Returns 'True' if the provided keyword argument passes all validation checks. Returns 'False' if the key is already set in 'cls' and no keyword argument in 'kwargs' is provided to modify it.
+        type: The record type, whose '__slots__' are the attributes of the dictionary (class).
+    """
+    fields = tuple(key for key, value in layout.items() if not key.startswith("_") and not callable(value))
+    namespace = {key: staticmethod(value) if callable(value) else value for key, value in layout.items() if key not in fields}
+    namespace["__slots__"] = fields
+    namespace["__getitem__"] = _record_getitem
+    namespace["__contains__"] = lambda record, key: hasattr(record, key)
+    namespace["get"] = lambda record, key, default=None: getattr(record, key, default)
+    return type(layout["_name"], (), namespace)
+
+
+def _record_getitem(record: object, key: str) -> any:
+    """
+    Retrieve an attribute or method of a compact record like an item of a dictionary (object).
+
+    Args:
+        record (object): The compact record.
+        key (str): The name of the attribute or method.
+
+    Returns:
+        any: The value of the attribute or the method.
 
     Raises:
-        KeyError: If the key is required (set to 'None' in 'cls') but is not found in 'kwargs'.
-        KeyError: If the key in 'kwargs' is not a valid key in the 'cls' dictionary.
-        TypeError: If the value of the key in 'kwargs' is not of the expected type as specified by 'cls['_types'][key]'.
-        TypeError: If a custom validation function in 'cls['_types'][key]' fails.
-    """
-    if not cls[key] is None and not key in kwargs:
-        return False
-    if cls[key] is None and not key in kwargs:
-        raise KeyError(f"{key} must be provided")
-    if not all(key in cls for key in kwargs):
-        raise KeyError(f"{key} is not valid on {cls['_name']}")
-    _type = cls["_types"][key]
-    if isinstance(_type, type):
-        if not isinstance(kwargs[key], _type):
-            raise TypeError(f"{key} must be of type {_type.__name__}")
-    elif isinstance(_type, list):
-        if kwargs[key] not in _type:
-            raise TypeError(f"{key} must be one of {_type}")
-    elif callable(_type):
-        if not _type(kwargs[key]):
-            raise TypeError(f"{key} did not pass validation")
-    return True
+        KeyError: If the record has no such attribute or method.
+    """
+    try:
+        return getattr(record, key)
+    except AttributeError:
+        raise KeyError(key) from None
+
+
+def compile_checker(key: str, rule: any) -> Callable:
+    """
+    Compile a single rule of a '_types' dictionary into a function checking one value.
+    Types are checked with 'isinstance', lists of allowed values are turned into a 'frozenset' and callables are used as custom validation functions.
+
+    Args:
+        key (str): The name of the attribute the rule belongs to.
+        rule (any): The rule from the '_types' dictionary.
+
+    Returns:
+        Callable: A function returning an error message for an invalid value or 'None' for a valid one.
+    """
+    if isinstance(rule, type):
+        return lambda value: None if isinstance(value, rule) else f"{key} must be of type {rule.__name__}"
+    if isinstance(rule, list):
+        allowed = frozenset(rule)
+
+        def check_allowed(value: any) -> str:
+            try:
+                return None if value in allowed else f"{key} must be one of {rule}"
+            except TypeError:
+                return f"{key} must be one of {rule}"
+
+        return check_allowed
+    if callable(rule):
+        return lambda value: None if rule(value) else f"{key} did not pass validation"
+    return lambda value: None
+
+
+def compile_validator(layout: dict) -> Callable:
+    """
+    Compile the rules defined in the '_types' dictionary of a merged dictionary (class) into a single function validating keyword arguments.
+    Unknown and missing keys are found with one set difference each, and every value is checked by its precompiled checker (see 'compile_checker').
+    Only the attributes of the class are valid keys, so methods and keys starting with '_' cannot be overridden by an instance.
+
+    Args:
+        layout (dict): The merged dictionary (class), as returned by 'merge_rec'.
+
+    Returns:
+        Callable: A function that takes the keyword arguments and raises if they are invalid. All errors are reported at once.
+            Raises KeyError if a key is unknown, missing or has no type definition, otherwise TypeError if a value does not match its type.
+    """
+    name = layout["_name"]
+    keys = frozenset(key for key, value in layout.items() if not key.startswith("_") and not callable(value))
+    required = frozenset(key for key in keys if layout[key] is None)
+    checkers = {key: compile_checker(key, rule) for key, rule in layout["_types"].items() if key in keys}
+
+    def validate(kwargs: dict) -> None:
+        key_errors = [f"{key} is not valid on {name}" for key in sorted(kwargs.keys() - keys)]
+        key_errors += [f"{key} must be provided" for key in sorted(required - kwargs.keys())]
+        type_errors = []
+        for key, value in kwargs.items():
+            if key not in keys:
+                continue
+            checker = checkers.get(key)
+            if checker is None:
+                key_errors.append(f"{key} has no type definition on {name}")
+                continue
+            error = checker(value)
+            if error is not None:
+                type_errors.append(error)
+        if key_errors:
+            raise KeyError("; ".join(key_errors + type_errors))
+        if type_errors:
+            raise TypeError("; ".join(type_errors))
+
+    return validate
+
+
+def _index_booking(vacation: dict, position: int) -> None:
+    """
+    Add a booking to the index of its class. If the class has a columnar cost function (see 'Columns'), the attributes of the booking are also appended to the columns of the class.
+    Once the total cost of the class has been computed by '_class_total_cost', the cost of the booking is added to it, so the next query does not recompute it.
+
+    Args:
+        vacation (dict): The booked dictionary (object).
+        position (int): The position of the booking in 'booked_vacations'.
+
+    Returns:
+        None
+    """
+    global _indexed_count
+    name = vacation["_name"]
+    entry = _booking_index.get(name)
+    if entry is None:
+        spec = Columns.get(name)
+        columns = {key: array(code) for key, code in spec["columns"].items()} if spec else None
+        types = get_types(vacation)
+        entry = _booking_index[name] = {
+            "bookings": [],
+            "positions": [],
+            "rows": None,
+            "results": {},
+            "versions": {},
+            "generation": 0,
+            "columns": columns,
+            "total_cost": None,
+            "types": types,
+        }
+        _search_terms.clear()
+    if entry["rows"] is not None:
+        entry["rows"][id(vacation)] = len(entry["bookings"])
+    for key, index in _attribute_indexes.items():
+        if key in vacation:
+            index["values"].setdefault(vacation[key], []).append(position)
+            index["sorted"] = None
+    entry["bookings"].append(vacation)
+    entry["positions"].append(position)
+    if entry["total_cost"] is not None:
+        entry["total_cost"] += call(vacation, "calculate_cost")
+    if entry["columns"] is not None:
+        try:
+            for key, column in entry["columns"].items():
+                column.append(_encode(vacation, key, entry["types"]))
+        except (OverflowError, TypeError):
+            entry["columns"] = None  # Values that do not fit the columns fall back to 'call'
+    _indexed_count += 1
+
+
+def _encode(vacation: dict, key: str, types: dict) -> int:
+    """
+    Encode an attribute of a booking for its column. Values restricted to a list of allowed values are encoded as their index in that list.
+
+    Args:
+        vacation (dict): The booked dictionary (object).
+        key (str): The name of the attribute.
+        types (dict): The merged type dictionary of the class of the booking (see 'get_types').
+
+    Returns:
+        int: The encoded value.
+    """
+    rule = types.get(key)
+    if isinstance(rule, list):
+        return rule.index(vacation[key])
+    return vacation[key]
+
+
+def _columnar_cost(name: str) -> Callable | None:
+    """
+    Retrieve the columnar cost function of a class from 'Columns', as long as the 'calculate_cost' method of the class is still the function it mirrors.
+    If the method was replaced (and 'invalidate_layout' called), the columnar function would compute the old costs, so it must not be used.
+
+    Args:
+        name (str): The name of the class.
+
+    Returns:
+        Callable | None: The columnar cost function, or None if the class has none or its 'calculate_cost' method was replaced.
+    """
+    spec = Columns.get(name)
+    if spec is None:
+        return None
+    try:
+        method = resolve_method(name, "calculate_cost")
+    except KeyError:
+        return None
+    return spec["calculate_cost"] if method is spec["mirrors"] else None
+
+
+def _class_total_cost(name: str) -> int:
+    """
+    Retrieve the total cost of all bookings of a class. It is computed with the columnar cost function of the class if available (see '_columnar_cost', otherwise by calling 'calculate_cost' on every booking) when it is first queried.
+    Afterwards, it is kept up to date by adding the cost of every new booking (see '_index_booking') and the change in cost of every booking changed with 'set_attr'.
+
+    Args:
+        name (str): The name of the class.
+
+    Returns:
+        int: The total cost of all bookings of the class.
+    """
+    with _lock:
+        entry = _booking_index[name]
+        if entry["total_cost"] is None:
+            calculate_cost = _columnar_cost(name)
+            if calculate_cost is not None and entry["columns"] is not None:
+                entry["total_cost"] = calculate_cost(entry["columns"])
+            else:
+                entry["total_cost"] = sum([call_memoized(vacation, "calculate_cost") for vacation in entry["bookings"]])
+        return entry["total_cost"]
+
+
+def _sync_index() -> None:
+    """
+    Rebuild the booking index if 'booked_vacations' was changed without going through 'new' or 'clear_bookings'.
+
+    Returns:
+        None
+    """
+    global _indexed_count
+    with _lock:
+        if _indexed_count == len(booked_vacations):
+            return
+        _booking_index.clear()
+        _search_terms.clear()
+        _attribute_indexes.clear()
+        _indexed_count = 0
+        for position, vacation in enumerate(booked_vacations):
+            _index_booking(vacation, position)
+
+
+def clear_bookings() -> None:
+    """
+    Remove all booked vacations together with their index.
+
+    Returns:
+        None
+    """
+    global _indexed_count
+    with _lock:
+        booked_vacations.clear()
+        _booking_index.clear()
+        _search_terms.clear()
+        _attribute_indexes.clear()
+        _indexed_count = 0
+
+
+def find_classes(search_term: str) -> tuple[str]:
+    """
+    Find the names of all booked classes containing the search term (case-insensitive). Results are cached until a booking of a new class is made.
+
+    Args:
+        search_term (str): The term to search for in the class names. An empty term matches all classes.
+
+    Returns:
+        tuple[str]: The names of the matching classes.
+    """
+    term = search_term.lower()
+    with _lock:
+        _sync_index()
+        names = _search_terms.get(term)
+        if names is None:
+            names = _search_terms[term] = tuple(name for name in _booking_index if term in name.lower())
+        return names
+
+
+def find_bookings(search_term: str) -> list[dict]:
+    """
+    Find all booked vacations whose class name contains the search term (case-insensitive), in the order they were booked.
+
+    Args:
+        search_term (str): The term to search for in the class names. An empty term matches all bookings.
+
+    Returns:
+        list[dict]: The matching booked dictionaries (objects).
+    """
+    return list(iter_bookings(search_term))
+
+
+def iter_bookings(search_term: str) -> Iterator[dict]:
+    """
+    Lazily iterate over all booked vacations whose class name contains the search term (case-insensitive), in the order they were booked.
+    The bookings of the matching classes are merged by their position in 'booked_vacations' without copying them into a new list.
+    Since the index only ever grows, the iterator covers exactly the bookings made before it was created: bookings made while iterating are not included.
+    The bookings themselves are not copied, so attributes changed with 'set_attr' while iterating are seen with their new values.
+
+    Args:
+        search_term (str): The term to search for in the class names. An empty term matches all bookings.
+
+    Returns:
+        Iterator[dict]: The matching booked dictionaries (objects).
+    """
+    with _lock:
+        entries = [(_booking_index[name], len(_booking_index[name]["bookings"])) for name in find_classes(search_term)]
+    if len(entries) == 1:
+        entry, count = entries[0]
+        return islice(entry["bookings"], count)
+    merged = heapq.merge(*(islice(zip(entry["positions"], entry["bookings"]), count) for entry, count in entries))
+    return (vacation for _, vacation in merged)
+
+
+def select_bookings(search_term: str = "", **predicates) -> list[dict]:
+    """
+    Find all booked vacations whose class name contains the search term (case-insensitive) and whose attributes match all predicates, in the order they were booked.
+    A predicate is either a value the attribute must equal, a tuple '(low, high)' of inclusive bounds (use None for an open bound), or a function returning whether a value matches.
+    Values and bounds are looked up in per-attribute indexes (see 'get_attribute_index'), so only the bookings matching the most selective of them are checked against the other predicates.
+
+    Args:
+        search_term (str, optional): The term to search for in the class names. Defaults to "", which matches all classes.
+        **predicates: The predicates, keyed by attribute name. Bookings without an attribute never match a predicate on it.
+
+    Returns:
+        list[dict]: The matching booked dictionaries (objects).
+    """
+    with _lock:
+        names = set(find_classes(search_term))
+        candidates = None
+        for key, predicate in predicates.items():
+            if callable(predicate):
+                continue
+            positions, start, end = _find_positions(get_attribute_index(key), predicate)
+            if candidates is None or end - start < candidates[3] - candidates[2]:
+                candidates = (key, positions, start, end)
+        if candidates is None:
+            vacations = iter_bookings(search_term)
+            checks = [(key, compile_predicate(predicate)) for key, predicate in predicates.items()]
+        else:
+            indexed_key, positions, start, end = candidates
+            vacations = [booked_vacations[position] for position in sorted(positions[start:end])]
+            checks = [(key, compile_predicate(predicate)) for key, predicate in predicates.items() if key != indexed_key]
+            if len(names) == len(_booking_index):
+                names = None  # All classes match, so the class names need not be checked
+        selected = []
+        for vacation in vacations:
+            if names is not None and vacation["_name"] not in names:
+                continue
+            for key, check in checks:
+                if key not in vacation or not check(vacation[key]):
+                    break
+            else:
+                selected.append(vacation)
+        return selected
+
+
+def aggregate_bookings(group_by: str = "_name", search_term: str = "", **predicates) -> dict:
+    """
+    Group the booked vacations selected by 'select_bookings' by an attribute and aggregate the results of their 'calculate_cost' methods.
+    Grouping all bookings by class is answered from the class totals of the booking index without visiting the bookings.
+
+    Args:
+        group_by (str, optional): The attribute to group by, e.g. "destination". Defaults to "_name", which groups by class.
+        search_term (str, optional): The term to search for in the class names. Defaults to "", which matches all classes.
+        **predicates: The predicates the bookings must match (see 'select_bookings').
+
+    Returns:
+        dict: The number of bookings ('count'), the total cost ('sum') and the average cost ('avg') of each group, keyed by the value of the grouping attribute.
+    """
+    groups = {}
+    if group_by == "_name" and not predicates:
+        with _lock:
+            for name in find_classes(search_term):
+                groups[name] = {"count": len(_booking_index[name]["bookings"]), "sum": _class_total_cost(name)}
+    else:
+        for vacation in select_bookings(search_term, **predicates):
+            group = groups.setdefault(vacation[group_by] if group_by in vacation else None, {"count": 0, "sum": 0})
+            group["count"] += 1
+            group["sum"] += call_memoized(vacation, "calculate_cost")
+    for group in groups.values():
+        group["avg"] = group["sum"] / group["count"]
+    return groups
+
+
+def get_attribute_index(key: str) -> dict:
+    """
+    Retrieve the index of an attribute, mapping each of its values to the positions of the bookings having it in 'booked_vacations'.
+    It is built on first use and kept up to date by every booking and by 'set_attr'. A sorted copy for range queries is built on the first range query after a change.
+
+    Args:
+        key (str): The name of the attribute.
+
+    Returns:
+        dict: The positions per value ('values') and the sorted values with their positions ('sorted', or None until needed).
+    """
+    with _lock:
+        _sync_index()
+        index = _attribute_indexes.get(key)
+        if index is None:
+            values = {}
+            for position, vacation in enumerate(booked_vacations):
+                if key in vacation:
+                    values.setdefault(vacation[key], []).append(position)
+            index = _attribute_indexes[key] = {"values": values, "sorted": None}
+        return index
+
+
+def _find_positions(index: dict, predicate: any) -> tuple[list[int], int, int]:
+    """
+    Look up the positions of the bookings matching a value or a tuple of bounds in an attribute index.
+    The positions are returned as a range of a list, so that the number of matches is known without copying them.
+
+    Args:
+        index (dict): The attribute index, as returned by 'get_attribute_index'.
+        predicate (any): The value or the tuple '(low, high)' of inclusive bounds.
+
+    Returns:
+        tuple[list[int], int, int]: A list of positions and the start and end of the range of matching bookings in it, not necessarily in booking order.
+    """
+    if not isinstance(predicate, tuple):
+        positions = index["values"].get(predicate, [])
+        return positions, 0, len(positions)
+    if index["sorted"] is None:
+        pairs = sorted((value, position) for value, positions in index["values"].items() for position in positions)
+        index["sorted"] = ([value for value, _ in pairs], [position for _, position in pairs])
+    values, positions = index["sorted"]
+    low, high = predicate
+    start = 0 if low is None else bisect.bisect_left(values, low)
+    end = len(values) if high is None else bisect.bisect_right(values, high)
+    return positions, start, end
+
+
+def compile_predicate(predicate: any) -> Callable:
+    """
+    Compile a predicate of 'select_bookings' into a function checking one attribute value, like 'compile_checker' does for type rules.
+
+    Args:
+        predicate (any): A value to compare with, a tuple '(low, high)' of inclusive bounds (None for an open bound) or a function.
+
+    Returns:
+        Callable: A function returning whether a value matches the predicate.
+    """
+    if callable(predicate):
+        return predicate
+    if isinstance(predicate, tuple):
+        low, high = predicate
+        if low is None:
+            return lambda value: high is None or value <= high
+        if high is None:
+            return lambda value: low <= value
+        return lambda value: low <= value <= high
+    return lambda value: value == predicate
+
+
+def iter_vacation_summary(cls: dict) -> Iterator[str]:
+    """
+    Lazily yield the description of every booking matching the search term of a 'VacationBookingSummary', in the order they were booked.
+    Descriptions already memoized by 'call_memoized' are reused, all others are computed without being remembered, so the report is never held in memory as a whole.
+    If the summary was created with a 'store' (see 'open_store'), the stored bookings are described instead of the booked ones.
+
+    Args:
+        cls (dict): The 'VacationBookingSummary' dictionary (object).
+
+    Returns:
+        Iterator[str]: The descriptions of the matching bookings.
+    """
+    if cls["store"]:
+        for vacation in iter_store_bookings(cls["store"], cls["search_term"]):
+            yield call(vacation, "describe_package")
+        return
+    for vacation in iter_bookings(cls["search_term"]):
+        yield call_memoized(vacation, "describe_package", remember=False)
+
+
+def write_vacation_summary(cls: dict, file: any, chunk_size: int = 65536) -> int:
+    """
+    Stream the descriptions of a 'VacationBookingSummary' (see 'iter_vacation_summary') to a file, separated by newlines like 'describe_package'.
+    Descriptions are joined into chunks of about 'chunk_size' characters, so only one chunk is held in memory and written at a time.
+
+    Args:
+        cls (dict): The 'VacationBookingSummary' dictionary (object).
+        file (any): A writable text file, e.g. opened with 'open' or a socket wrapped with 'socket.makefile("w")'.
+        chunk_size (int, optional): The number of characters to collect before writing. Defaults to 65536.
+
+    Returns:
+        int: The number of descriptions written.
+    """
+    chunk = []
+    size = 0
+    count = 0
+    for description in iter_vacation_summary(cls):
+        if count:
+            description = "\n" + description
+        chunk.append(description)
+        size += len(description)
+        count += 1
+        if size >= chunk_size:
+            file.write("".join(chunk))
+            chunk.clear()
+            size = 0
+    if chunk:
+        file.write("".join(chunk))
+    return count
 
 
 def new(cls: dict, **kwargs) -> dict:
     """
-    Instantiates a new dictionary containing all methods and attributes of the provided dictionary (class) and all its parents. Fills its attributes with the values provided via '**kwargs'.
+    Instantiates a new dictionary containing the '_name' and all attributes of the provided dictionary (class) and all its parents. Fills its attributes with the values provided via '**kwargs'.
+    Methods and type information stay on the classes and are resolved through the '_parent' chain when needed (see 'call' and 'get_types'), so every instance only holds its own fields.
+    The instance template and the validator are taken from the layout cache (see 'get_layout'), so only the first instantiation of a class walks its hierarchy.
+    Bookings are appended to 'booked_vacations' and added to the booking index used by 'VacationBookingSummary'.
 
     Args:
         cls (dict): The dictionary (class) to be instantiated.
@@ -274,16 +1187,692 @@ def new(cls: dict, **kwargs) -> dict:
         dict: The newly instantiated dictionary filled with the provided attributes.
 
     Raises:
-        KeyError: If a required attribute is not provided in '**kwargs'.
+        KeyError: If a required attribute is not provided in '**kwargs', an unknown attribute is provided or a method is overridden.
         TypeError: If an attribute does not match the expected type.
     """
-    merged_cls = merge_rec(cls)
-    for key in merged_cls.keys():
-        if is_valid_kwarg(merged_cls, kwargs, key):
-            merged_cls[key] = kwargs[key]
-    if not merged_cls["_name"] == "VacationBookingSummary":
-        booked_vacations.append(merged_cls)
-    return merged_cls
+    _, _, validate, _, template = _get_entry(cls)
+    validate(kwargs)
+    instance = dict(template)
+    instance.update(kwargs)
+    _book(instance)
+    return instance
+
+
+def new_many(cls: dict, rows: Iterable[dict] | dict) -> tuple[list[dict], dict[int, Exception]]:
+    """
+    Instantiates many new dictionaries of the provided dictionary (class) at once, e.g. when loading bookings from a feed.
+    Every row is validated against the same cached layout and validator (see 'get_layout'), invalid rows are skipped and reported without aborting the batch,
+    and all valid instances are appended to 'booked_vacations' in one step.
+
+    Args:
+        cls (dict): The dictionary (class) to be instantiated.
+        rows (Iterable[dict] | dict): The attributes of each instance, either as an iterable of dictionaries like the '**kwargs' of 'new',
+            or as a dictionary of columns mapping each attribute to a list of values of the same length.
+
+    Returns:
+        tuple[list[dict], dict[int, Exception]]: The newly instantiated dictionaries, and the KeyError or TypeError raised for each invalid row, keyed by the index of the row.
+            Rows that are not dictionaries are reported with a TypeError.
+
+    Raises:
+        ValueError: If the columns differ in length. Nothing is booked in this case.
+    """
+    _, _, validate, _, template = _get_entry(cls)
+    if isinstance(rows, dict):
+        lengths = {key: len(values) for key, values in rows.items()}
+        if len(set(lengths.values())) > 1:
+            raise ValueError(f"columns differ in length: {lengths}")
+        keys = list(rows)
+        rows = (dict(zip(keys, values)) for values in zip(*rows.values()))
+    instances = []
+    errors = {}
+    for i, kwargs in enumerate(rows):
+        if not isinstance(kwargs, dict):
+            errors[i] = TypeError(f"row must be a dictionary, not {type(kwargs).__name__}")
+            continue
+        try:
+            validate(kwargs)
+        except (KeyError, TypeError) as error:
+            errors[i] = error
+            continue
+        instance = dict(template)
+        instance.update(kwargs)
+        instances.append(instance)
+    _book_many(instances)
+    return instances, errors
+
+
+def new_compact(cls: dict, **kwargs) -> object:
+    """
+    Instantiates a new compact record of the provided dictionary (class) (see 'build_record_type'). It is validated and booked exactly like an instance created by 'new',
+    but only stores the values of its attributes, which makes it much smaller.
+
+    Args:
+        cls (dict): The dictionary (class) to be instantiated.
+        **kwargs: Attributes to set on the new instance.
+
+    Returns:
+        object: The newly instantiated record filled with the provided attributes.
+
+    Raises:
+        KeyError: If a required attribute is not provided in '**kwargs', an unknown attribute is provided or a method is overridden.
+        TypeError: If an attribute does not match the expected type.
+    """
+    _, layout, validate, record_type, _ = _get_entry(cls)
+    validate(kwargs)
+    record = record_type()
+    for key in record_type.__slots__:
+        setattr(record, key, kwargs[key] if key in kwargs else layout[key])
+    _book(record)
+    return record
+
+
+def _book(vacation: dict) -> None:
+    """
+    Append a vacation to 'booked_vacations' and add it to the booking index. Instances of 'VacationBookingSummary' are not booked.
+
+    Args:
+        vacation (dict): The newly instantiated dictionary (object).
+
+    Returns:
+        None
+    """
+    if vacation["_name"] == "VacationBookingSummary":
+        return
+    with _lock:
+        _sync_index()
+        booked_vacations.append(vacation)
+        _index_booking(vacation, len(booked_vacations) - 1)
+
+
+def _book_many(vacations: list[dict]) -> None:
+    """
+    Append many vacations of the same class to 'booked_vacations' in one step and add them to the booking index. Instances of 'VacationBookingSummary' are not booked.
+
+    Args:
+        vacations (list[dict]): The newly instantiated dictionaries (objects).
+
+    Returns:
+        None
+    """
+    if not vacations or vacations[0]["_name"] == "VacationBookingSummary":
+        return
+    with _lock:
+        _sync_index()
+        start = len(booked_vacations)
+        booked_vacations.extend(vacations)
+        for position, vacation in enumerate(vacations, start):
+            _index_booking(vacation, position)
+
+
+def load_bookings(path: str, file_format: str = None, chunk_size: int = 10000) -> tuple[int, dict[int, Exception]]:
+    """
+    Book all vacations stored in a CSV or JSON-lines file. Every row names its class in a 'type' column (see 'Bookings') and its attributes in the other columns.
+    The file is streamed in chunks of 'chunk_size' rows, and consecutive rows of the same class are booked together with 'new_many', so invalid rows are reported without aborting the load.
+
+    Args:
+        path (str): The path to the file.
+        file_format (str, optional): Either "csv" or "jsonl". Defaults to None, which infers the format from the file extension.
+        chunk_size (int, optional): The number of rows to read at a time. Defaults to 10000.
+
+    Returns:
+        tuple[int, dict[int, Exception]]: The number of booked vacations, and the error raised for each invalid row, keyed by the index of the row (not counting the CSV header and empty lines).
+    """
+    file_format = file_format or _file_format(path)
+    count = 0
+    errors = {}
+    with open(path, "r", newline="") as file:
+        if file_format == "csv":
+            rows = csv.DictReader(file)
+        else:
+            rows = (line for line in file if line.strip())
+        rows = enumerate(rows)
+        while chunk := list(islice(rows, chunk_size)):
+            count += _load_chunk(chunk, file_format, errors)
+    return count, errors
+
+
+def _load_chunk(chunk: list[tuple[int, any]], file_format: str, errors: dict[int, Exception]) -> int:
+    """
+    Book the vacations of one chunk of rows read by 'load_bookings', preserving their order.
+
+    Args:
+        chunk (list[tuple[int, any]]): The index and the raw row (a dictionary for CSV, a line for JSON-lines) of each row.
+        file_format (str): Either "csv" or "jsonl".
+        errors (dict[int, Exception]): The errors of invalid rows, updated in place.
+
+    Returns:
+        int: The number of booked vacations.
+    """
+    count = 0
+    batch_cls = None
+    batch = []
+    indices = []
+    for index, row in chunk:
+        try:
+            cls, kwargs = _parse_row(row, file_format)
+        except (KeyError, TypeError, ValueError) as error:
+            errors[index] = error
+            continue
+        if cls is not batch_cls:
+            count += _load_batch(batch_cls, batch, indices, errors)
+            batch_cls, batch, indices = cls, [], []
+        batch.append(kwargs)
+        indices.append(index)
+    return count + _load_batch(batch_cls, batch, indices, errors)
+
+
+def _load_batch(cls: dict, batch: list[dict], indices: list[int], errors: dict[int, Exception]) -> int:
+    """
+    Book consecutive rows of the same class with 'new_many' and record the errors of invalid rows by their index in the file.
+
+    Args:
+        cls (dict): The dictionary (class) to be instantiated.
+        batch (list[dict]): The keyword arguments of each row.
+        indices (list[int]): The index of each row in the file.
+        errors (dict[int, Exception]): The errors of invalid rows, updated in place.
+
+    Returns:
+        int: The number of booked vacations.
+    """
+    if not batch:
+        return 0
+    instances, batch_errors = new_many(cls, batch)
+    for i, error in batch_errors.items():
+        errors[indices[i]] = error
+    return len(instances)
+
+
+def _parse_row(row: any, file_format: str) -> tuple[dict, dict]:
+    """
+    Parse a raw row read by 'load_bookings' into the dictionary (class) to instantiate and its keyword arguments.
+    CSV values are converted according to the '_types' rules of the class: booleans from "True" and "False", integers for all rules that are neither 'str' nor a list of allowed values.
+    Empty CSV values of attributes the class does not have are ignored.
+
+    Args:
+        row (any): The raw row, a dictionary for CSV or a line for JSON-lines.
+        file_format (str): Either "csv" or "jsonl".
+
+    Returns:
+        tuple[dict, dict]: The dictionary (class) and the keyword arguments for 'new'.
+
+    Raises:
+        KeyError: If the row has no 'type' or it is not listed in 'Bookings'.
+        ValueError: If a JSON-lines row is not valid JSON.
+        TypeError: If a JSON-lines row is not an object.
+    """
+    if file_format != "csv":
+        row = json.loads(row)
+        if not isinstance(row, dict):
+            raise TypeError("row must be a JSON object")
+    row = dict(row)
+    name = row.pop("type", None)
+    if name not in Bookings:
+        raise KeyError(f"type '{name}' is not one of {list(Bookings)}")
+    cls = Bookings[name]
+    if file_format != "csv":
+        return cls, row
+    layout = get_layout(cls)
+    kwargs = {}
+    for key, value in row.items():
+        if key in layout:
+            kwargs[key] = _parse_value(layout["_types"].get(key), value)
+        elif value:
+            kwargs[key] = value
+    return cls, kwargs
+
+
+def _parse_value(rule: any, value: str) -> any:
+    """
+    Convert a CSV value according to its rule from a '_types' dictionary. Values that cannot be converted are returned unchanged, so that validation reports them.
+
+    Args:
+        rule (any): The rule from the '_types' dictionary.
+        value (str): The CSV value.
+
+    Returns:
+        any: The converted value.
+    """
+    if rule is str or isinstance(rule, list):
+        return value
+    if rule is bool:
+        return {"True": True, "False": False}.get(value, value)
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def export_bookings(path: str, search_term: str = "", file_format: str = None) -> int:
+    """
+    Write all booked vacations whose class name contains the search term to a CSV or JSON-lines file that can be read by 'load_bookings'.
+    The bookings are streamed in the order they were booked (see 'iter_bookings'), so only the file buffer is held in memory.
+
+    Args:
+        path (str): The path to the file.
+        search_term (str, optional): The term to search for in the class names. Defaults to "", which matches all bookings.
+        file_format (str, optional): Either "csv" or "jsonl". Defaults to None, which infers the format from the file extension.
+
+    Returns:
+        int: The number of written bookings.
+    """
+    file_format = file_format or _file_format(path)
+    attributes = {name: get_record_type(find_class(name)).__slots__ for name in find_classes(search_term)}
+    count = 0
+    with open(path, "w", newline="") as file:
+        if file_format == "csv":
+            fields = list(dict.fromkeys(key for keys in attributes.values() for key in keys))
+            writer = csv.writer(file)
+            writer.writerow(["type"] + fields)
+            for vacation in iter_bookings(search_term):
+                writer.writerow([vacation["_name"]] + [vacation.get(key, "") for key in fields])
+                count += 1
+        else:
+            for vacation in iter_bookings(search_term):
+                name = vacation["_name"]
+                row = {"type": name}
+                for key in attributes[name]:
+                    row[key] = vacation[key]
+                file.write(json.dumps(row) + "\n")
+                count += 1
+    return count
+
+
+def _file_format(path: str) -> str:
+    """
+    Infer the format of a booking file from its extension.
+
+    Args:
+        path (str): The path to the file.
+
+    Returns:
+        str: "csv" for '.csv' files, otherwise "jsonl".
+    """
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def save_store(path: str, search_term: str = "") -> int:
+    """
+    Write all booked vacations whose class name contains the search term to a compact binary store that can be opened with 'open_store'.
+    The bookings of each class are stored as one block of fixed-width columns: the attributes of the class listed in 'Columns' (encoded like in the booking index),
+    the position of each booking in booking order, and the destination padded to 'DESTINATION_WIDTH' bytes. Numbers use the native byte order.
+    All bookings are validated before anything is written, and the store is written to a temporary file that replaces 'path' once it is complete,
+    so a failed save never leaves a truncated store behind (nor truncates a store that is currently opened).
+
+    Args:
+        path (str): The path to the store file.
+        search_term (str, optional): The term to search for in the class names. Defaults to "", which matches all bookings.
+
+    Returns:
+        int: The number of stored bookings.
+
+    Raises:
+        KeyError: If a matching class has no columns in 'Columns'.
+        ValueError: If a class name is longer than 'NAME_WIDTH' bytes or a destination is longer than 'DESTINATION_WIDTH' bytes.
+    """
+    blocks = []
+    with _lock:
+        for name in find_classes(search_term):
+            if name not in Columns:
+                raise KeyError(f"Class '{name}' has no columns to store")
+            entry = _booking_index[name]
+            bookings = entry["bookings"][:]
+            columns = entry["columns"]
+            if columns is None:
+                spec = Columns[name]["columns"]
+                columns = {key: array(code, [_encode(vacation, key, entry["types"]) for vacation in bookings]) for key, code in spec.items()}
+            chunks = [columns[key].tobytes() for key in Columns[name]["columns"]]
+            chunks.append(array("q", entry["positions"]).tobytes())
+            blocks.append((name, bookings, chunks))
+    for name, bookings, chunks in blocks:
+        if len(name.encode()) > NAME_WIDTH:
+            raise ValueError(f"class name '{name}' is longer than {NAME_WIDTH} bytes")
+        destinations = [vacation["destination"].encode() for vacation in bookings]
+        for vacation, destination in zip(bookings, destinations):
+            if len(destination) > DESTINATION_WIDTH:
+                raise ValueError(f"destination '{vacation['destination']}' is longer than {DESTINATION_WIDTH} bytes")
+        chunks.append(b"".join(destination.ljust(DESTINATION_WIDTH, b"\0") for destination in destinations))
+    offset = STORE_HEADER.size + STORE_DIRECTORY.size * len(blocks)
+    temporary = f"{path}.tmp"
+    try:
+        with open(temporary, "wb") as file:
+            file.write(STORE_HEADER.pack(STORE_MAGIC, len(blocks)))
+            for name, bookings, chunks in blocks:
+                file.write(STORE_DIRECTORY.pack(name.encode(), len(bookings), _align(offset)))
+                offset = _align(offset) + sum(_align(len(chunk)) for chunk in chunks[:-1]) + len(chunks[-1])
+            for name, bookings, chunks in blocks:
+                file.write(b"\0" * (_align(file.tell()) - file.tell()))
+                for chunk in chunks[:-1]:
+                    file.write(chunk + b"\0" * (_align(len(chunk)) - len(chunk)))
+                file.write(chunks[-1])
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return sum(len(bookings) for _, bookings, _ in blocks)
+
+
+def _align(offset: int) -> int:
+    """
+    Round an offset in a store file up to the next multiple of 8, so that every column can be read as a typed 'memoryview'.
+
+    Args:
+        offset (int): The offset in bytes.
+
+    Returns:
+        int: The aligned offset in bytes.
+    """
+    return (offset + 7) & ~7
+
+
+def open_store(path: str) -> dict:
+    """
+    Open a booking store written by 'save_store' by memory-mapping it. The columns of each class are exposed as typed 'memoryview's of the mapped file,
+    so opening is independent of the number of stored bookings and nothing is copied or instantiated until it is read.
+    Pass the returned store to a 'VacationBookingSummary' to query it, and close it with 'close_store'.
+
+    Args:
+        path (str): The path to the store file.
+
+    Returns:
+        dict: The store, with the mapped file and the number of bookings, columns, positions and destinations of each stored class.
+
+    Raises:
+        ValueError: If the file is not a booking store or it is truncated.
+    """
+    file = open(path, "rb")
+    store = {"file": file, "mmap": None, "views": [], "classes": {}}
+    try:
+        if os.fstat(file.fileno()).st_size < STORE_HEADER.size:
+            raise ValueError(f"'{path}' is not a booking store")
+        mapped = store["mmap"] = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, class_count = STORE_HEADER.unpack_from(mapped, 0)
+        if magic != STORE_MAGIC:
+            raise ValueError(f"'{path}' is not a booking store")
+        view = memoryview(mapped)
+        store["views"].append(view)
+        for i in range(class_count):
+            name, count, offset = STORE_DIRECTORY.unpack_from(mapped, STORE_HEADER.size + i * STORE_DIRECTORY.size)
+            name = name.rstrip(b"\0").decode()
+            columns = {}
+            for key, code in list(Columns[name]["columns"].items()) + [("_position", "q")]:
+                size = count * array(code).itemsize
+                if offset + size > len(mapped):
+                    raise ValueError(f"'{path}' is truncated")
+                columns[key] = view[offset : offset + size].cast(code)
+                store["views"].append(columns[key])
+                offset = _align(offset + size)
+            if offset + count * DESTINATION_WIDTH > len(mapped):
+                raise ValueError(f"'{path}' is truncated")
+            destinations = view[offset : offset + count * DESTINATION_WIDTH]
+            store["views"].append(destinations)
+            positions = columns.pop("_position")
+            store["classes"][name] = {"count": count, "columns": columns, "positions": positions, "destinations": destinations}
+    except struct.error as error:
+        close_store(store)
+        raise ValueError(f"'{path}' is truncated") from error
+    except BaseException:
+        close_store(store)
+        raise
+    return store
+
+
+def close_store(store: dict) -> None:
+    """
+    Close a booking store opened by 'open_store'. Bookings read from the store stay valid, but querying the store afterwards raises a ValueError.
+
+    Args:
+        store (dict): The store to close.
+
+    Returns:
+        None
+    """
+    for view in reversed(store["views"]):
+        view.release()
+    store["views"].clear()
+    store["classes"].clear()
+    if store["mmap"] is not None:
+        store["mmap"].close()
+    store["file"].close()
+
+
+def calculate_store_cost(store: dict, search_term: str = "") -> int:
+    """
+    Compute the total cost of all stored bookings whose class name contains the search term (case-insensitive) directly from the mapped columns,
+    using the columnar cost functions of 'Columns' (see '_columnar_cost'). Classes whose 'calculate_cost' method was replaced are decoded and computed booking by booking instead.
+
+    Args:
+        store (dict): The store opened by 'open_store'.
+        search_term (str, optional): The term to search for in the class names. Defaults to "", which matches all bookings.
+
+    Returns:
+        int: The total cost of the matching stored bookings.
+
+    Raises:
+        ValueError: If the store was closed with 'close_store'.
+    """
+    _check_store(store)
+    term = search_term.lower()
+    total_cost = 0
+    for name, stored in store["classes"].items():
+        if term in name.lower():
+            calculate_cost = _columnar_cost(name)
+            if calculate_cost is not None:
+                total_cost += calculate_cost(stored["columns"])
+            else:
+                total_cost += sum(call(record, "calculate_cost") for _, record in _read_store_class(name, stored))
+    return total_cost
+
+
+def iter_store_bookings(store: dict, search_term: str = "") -> Iterator[object]:
+    """
+    Lazily read all stored bookings whose class name contains the search term (case-insensitive), in the order they were booked.
+    Each booking is decoded into a compact record (see 'build_record_type') without validating or booking it.
+
+    Args:
+        store (dict): The store opened by 'open_store'.
+        search_term (str, optional): The term to search for in the class names. Defaults to "", which matches all bookings.
+
+    Returns:
+        Iterator[object]: The matching stored bookings as compact records.
+
+    Raises:
+        ValueError: If the store was closed with 'close_store'.
+    """
+    _check_store(store)
+    term = search_term.lower()
+    readers = [_read_store_class(name, stored) for name, stored in store["classes"].items() if term in name.lower()]
+    return (record for _, record in heapq.merge(*readers, key=lambda item: item[0]))
+
+
+def _check_store(store: dict) -> None:
+    """
+    Make sure a booking store can be queried, i.e. it was not closed with 'close_store'.
+
+    Args:
+        store (dict): The store opened by 'open_store'.
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: If the store was closed.
+    """
+    if store["file"].closed:
+        raise ValueError("I/O operation on closed booking store")
+
+
+def _read_store_class(name: str, stored: dict) -> Iterator[tuple[int, object]]:
+    """
+    Lazily decode the stored bookings of one class into compact records.
+
+    Args:
+        name (str): The name of the class.
+        stored (dict): The stored class, as opened by 'open_store'.
+
+    Returns:
+        Iterator[tuple[int, object]]: The position in booking order and the compact record of each stored booking.
+    """
+    cls = find_class(name)
+    record_type = get_record_type(cls)
+    layout = get_layout(cls)
+    decoders = {}
+    for key in stored["columns"]:
+        rule = layout["_types"].get(key)
+        decoders[key] = rule.__getitem__ if isinstance(rule, list) else (bool if rule is bool else int)
+    destinations = stored["destinations"]
+    for row, position in enumerate(stored["positions"]):
+        record = record_type()
+        for key in record_type.__slots__:
+            setattr(record, key, layout[key])
+        for key, column in stored["columns"].items():
+            setattr(record, key, decoders[key](column[row]))
+        start = row * DESTINATION_WIDTH
+        record.destination = bytes(destinations[start : start + DESTINATION_WIDTH]).rstrip(b"\0").decode()
+        yield position, record
+
+
+def enable_profiling() -> None:
+    """
+    Replace the functions listed in 'PROFILED_FUNCTIONS' with instrumented versions (see '_profile_function'), which record the number of calls and the cumulative time
+    per class for the instantiation functions and 'merge_rec', and per class and method for 'call'. Only calls going through this module are recorded,
+    i.e. calls made by its own functions or via 'vacation_booking.new' and 'vacation_booking.call', so names imported before enabling remain unprofiled.
+    Profiling is enabled on import if the environment variable named by 'PROFILE_VARIABLE' is set, so it costs nothing when it is off.
+
+    Returns:
+        None
+    """
+    module = globals()
+    for name in PROFILED_FUNCTIONS:
+        if name not in _unprofiled:
+            _unprofiled[name] = module[name]
+            module[name] = _profile_function(module[name])
+
+
+def disable_profiling() -> None:
+    """
+    Restore the functions replaced by 'enable_profiling'. The recorded profile is kept until 'reset_profile' is called.
+
+    Returns:
+        None
+    """
+    module = globals()
+    for name, function in _unprofiled.items():
+        module[name] = function
+    _unprofiled.clear()
+
+
+def _profile_function(function: Callable) -> Callable:
+    """
+    Wrap a function taking a dictionary (class or object) as its first argument, so that every call adds its duration to the profile.
+    Calls of 'call' are recorded under the name of the called method, all other calls under the name of the function.
+
+    Args:
+        function (Callable): The function to wrap.
+
+    Returns:
+        Callable: The instrumented function.
+    """
+    operation = function.__name__
+
+    @wraps(function)
+    def profiled(cls: dict, *args, **kwargs) -> any:
+        start = time.perf_counter_ns()
+        try:
+            return function(cls, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            key = (cls.get("_name"), args[0] if operation == "call" else operation)
+            with _profile_lock:
+                stats = _profile.get(key)
+                if stats is None:
+                    stats = _profile[key] = [0, 0]
+                stats[0] += 1
+                stats[1] += elapsed
+
+    return profiled
+
+
+def reset_profile() -> None:
+    """
+    Remove all calls recorded while profiling.
+
+    Returns:
+        None
+    """
+    with _profile_lock:
+        _profile.clear()
+
+
+def get_profile() -> list[dict]:
+    """
+    Retrieve the calls recorded while profiling (see 'enable_profiling'). Times are cumulative, i.e. they include the time spent in nested profiled calls.
+
+    Returns:
+        list[dict]: One dictionary per class and operation with the keys 'class', 'operation', 'calls', 'total_ms' and 'mean_us',
+            sorted by descending total time.
+    """
+    with _profile_lock:
+        items = [(key, calls, total) for key, (calls, total) in _profile.items()]
+    items.sort(key=lambda item: item[2], reverse=True)
+    return [
+        {
+            "class": cls_name,
+            "operation": operation,
+            "calls": calls,
+            "total_ms": round(total / 1e6, 3),
+            "mean_us": round(total / calls / 1e3, 3),
+        }
+        for (cls_name, operation), calls, total in items
+    ]
+
+
+def profile_report() -> str:
+    """
+    Format the calls recorded while profiling as a table with one row per class and operation (see 'get_profile').
+
+    Returns:
+        str: The formatted table.
+    """
+    lines = [f"{'Class':<24}{'Operation':<24}{'Calls':>12}{'Total (ms)':>14}{'Mean (us)':>12}"]
+    for row in get_profile():
+        lines.append(
+            f"{str(row['class']):<24}{str(row['operation']):<24}{row['calls']:>12,}{row['total_ms']:>14.3f}{row['mean_us']:>12.3f}"
+        )
+    return "\n".join(lines)
+
+
+def export_profile(path: str) -> None:
+    """
+    Write the calls recorded while profiling to a JSON file (see 'get_profile').
+
+    Args:
+        path (str): The path of the JSON file.
+
+    Returns:
+        None
+    """
+    with open(path, "w") as file:
+        json.dump(get_profile(), file, indent=4)
+
+
+def _report_profile() -> None:
+    """
+    Print the profile when the interpreter exits, or export it if the environment variable named by 'PROFILE_VARIABLE' names a JSON file.
+
+    Returns:
+        None
+    """
+    target = os.environ.get(PROFILE_VARIABLE, "")
+    if target.endswith(".json"):
+        export_profile(target)
+    else:
+        print(profile_report())
+
+
+if os.environ.get(PROFILE_VARIABLE, "0") not in ("", "0"):
+    enable_profiling()
+    atexit.register(_report_profile)
 
 
 if __name__ == "__main__":
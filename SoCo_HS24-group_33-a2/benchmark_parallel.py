@@ -0,0 +1,54 @@
+from lgl_interpreter import Frame, Parallel, load_lgl, do
+import os
+import time
+
+
+def measure(program: list, repeat: int) -> float:
+    """
+    Evaluates the program several times in a fresh global frame and returns the fastest run.
+
+    Args:
+        program (list): The LGL code as a list.
+        repeat (int): How many times to evaluate the program.
+
+    Returns:
+        float: The fastest wall-clock time in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        do(Frame(), program)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    """
+    Compares sequential and parallel evaluation of an LGL program (defaults to 'example_parallel.gsc').
+    """
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Benchmark parallel LGL evaluation")
+    arg_parser.add_argument(
+        "filename", type=str, nargs="?", default="example_parallel.gsc", help="Path to file containing LGL code"
+    )
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Number of runs per mode")
+    args = arg_parser.parse_args()
+
+    program = load_lgl(args.filename)
+    sequential = measure(program, args.repeat)
+    Parallel.enable(args.workers)
+    do(Frame(), program)  # warm up the worker processes
+    parallel = measure(program, args.repeat)
+    Parallel.shutdown()
+
+    print(f"CPUs:       {os.cpu_count()}")
+    print(f"Workers:    {args.workers}")
+    print(f"Sequential: {sequential:.3f}s")
+    print(f"Parallel:   {parallel:.3f}s")
+    print(f"Speedup:    {sequential / parallel:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
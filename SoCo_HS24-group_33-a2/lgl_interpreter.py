@@ -1,6 +1,7 @@
 from datetime import datetime
 from hashlib import sha256
 import csv
+import heapq
 import time
 
 
@@ -9,14 +10,16 @@ class Frame:
     Mimics real Python frames (environments), enabling nested function definitions.
     """
 
-    def __init__(self, parent: "Frame" = None) -> None:
+    def __init__(self, parent: "Frame" = None, parameters: list[str] = None) -> None:
         """
         Initializes a new frame with an optional parent frame.
 
         Args:
             parent (Frame, optional): The parent frame. Defaults to None.
+            parameters (list[str], optional): The parameters of the function owning this frame, which are bound anew on every call. Defaults to None.
         """
         self.parent = parent
+        self.parameters = parameters or []
         self.environment = {}
 
     def get(self, var_name: str) -> any:
@@ -51,6 +54,8 @@ class Frame:
         Returns:
             None
         """
+        if Parallel.enabled:
+            Parallel.rebind(self, name, value)
         self.environment[name] = value
 
 
@@ -70,7 +75,7 @@ class Function:
         """
         self.parameters = parameters if isinstance(parameters, list) else [parameters]
         self.body = body
-        self.frame = Frame(frame)
+        self.frame = Frame(frame, self.parameters)
 
     def call(self, evaluated_args: list[int]) -> any:
         """
@@ -182,6 +187,235 @@ class Trace:
         return f"{datetime_part}.{perf_counter_part:06d}"
 
 
+class Parallel:
+    """
+    Opt-in parallel evaluation of independent operands. When enabled, the two operands of a binary operation
+    (e.g. '+' or 'AND') are evaluated concurrently if both are side-effect free and their estimated cost exceeds
+    'threshold'. The left operand is shipped to a process pool while the right operand is evaluated locally.
+    """
+
+    BINARY_OPERATIONS = ["add", "subtract", "multiply", "divide", "power", "AND", "OR", "XOR"]
+
+    enabled = False
+    threshold = 100000
+    workers = None
+    __executor = None
+    __analyses = {}  # Frame, expression, purity and cost of analyzed expressions, keyed by the IDs of frame and expression
+
+    @classmethod
+    def enable(cls, workers: int = None, threshold: int = None) -> None:
+        """
+        Turns on parallel evaluation.
+
+        Args:
+            workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+            threshold (int, optional): The minimal estimated cost both operands must have to be evaluated in parallel.
+
+        Returns:
+            None
+        """
+        cls.enabled = True
+        cls.workers = workers
+        cls.__analyses.clear()
+        if threshold is not None:
+            cls.threshold = threshold
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """
+        Turns off parallel evaluation and stops the worker processes.
+
+        Returns:
+            None
+        """
+        cls.enabled = False
+        cls.__analyses.clear()
+        if cls.__executor is not None:
+            cls.__executor.shutdown()
+            cls.__executor = None
+
+    @classmethod
+    def evaluate(cls, frame: Frame, args: list) -> list:
+        """
+        Evaluates both operands of a binary operation concurrently if it pays off. Otherwise, the operands are returned
+        untouched and evaluated sequentially by the operation itself. The trace entries recorded by the worker are
+        merged with the ones recorded locally in the meantime by their timestamps.
+
+        Args:
+            frame (Frame): The current execution frame.
+            args (list): A list containing the two operands of a binary operation.
+
+        Returns:
+            list: The two operands, already evaluated if they were evaluated in parallel.
+        """
+        if len(args) != 2 or not all(isinstance(arg, list) for arg in args):
+            return args
+        analyses = [cls.analyze(frame, arg) for arg in args]
+        if not all(pure for pure, _ in analyses) or min(cost for _, cost in analyses) < cls.threshold:
+            return args
+        start = len(Trace.call_stack)
+        future = cls.__pool().submit(Parallel.work, frame, args[0])
+        right = do(frame, args[1])
+        left, call_stack = future.result()
+        local = Trace.call_stack[start:]
+        Trace.call_stack[start:] = heapq.merge(local, call_stack, key=lambda entry: entry[1])
+        return [left, right]
+
+    @staticmethod
+    def work(frame: Frame, expression: list) -> tuple[any, list]:
+        """
+        Evaluates an expression inside a worker process. The call stack entries traced while evaluating it are removed
+        from the worker's 'Trace.call_stack' again, so long-lived workers do not accumulate them.
+
+        Args:
+            frame (Frame): A copy of the execution frame.
+            expression (list): The expression to evaluate.
+
+        Returns:
+            tuple[any, list]: The result of the expression and the call stack entries traced while evaluating it.
+        """
+        Parallel.enabled = False
+        start = len(Trace.call_stack)
+        result = do(frame, expression)
+        call_stack = Trace.call_stack[start:]
+        del Trace.call_stack[start:]
+        return result, call_stack
+
+    @classmethod
+    def analyze(cls, frame: Frame, expression: any) -> tuple[bool, int]:
+        """
+        Checks whether evaluating the expression is free of side effects, i.e. whether it neither contains a 'set'
+        itself nor calls a function whose body contains one or that is passed as a parameter, and estimates its cost. Every operation counts as one unit,
+        a power with a literal exponent additionally counts as many units as the exponent and calls include the cost of
+        the function body. The results are remembered per expression and frame, so the nested binary operations of an
+        expression do not walk it again (see 'rebind' for when they are dropped).
+
+        Args:
+            frame (Frame): The frame in which the expression would be evaluated.
+            expression (any): The expression to analyze.
+
+        Returns:
+            tuple[bool, int]: True if the expression is side-effect free, False otherwise, and its estimated cost.
+        """
+        pure, cost, _ = cls.__analyze(frame, expression, {})
+        return pure, cost
+
+    @classmethod
+    def __analyze(cls, frame: Frame, expression: any, functions: dict) -> tuple[bool, int, set]:
+        """
+        Analyzes an expression like 'analyze' in a single walk, analyzing the body of every called function only once.
+        Calls of functions that are still being analyzed are assumed to be pure and to cost one unit, which guards
+        against recursion. Results relying on such an assumption are not remembered.
+
+        Args:
+            frame (Frame): The frame in which the expression would be evaluated.
+            expression (any): The expression to analyze.
+            functions (dict): The analysis of the body of each function analyzed so far, keyed by the ID of the
+                function, or None while it is still being analyzed.
+
+        Returns:
+            tuple[bool, int, set]: Whether the expression is side-effect free, its estimated cost and the IDs of the
+                functions assumed to be pure.
+        """
+        if not isinstance(expression, list) or not expression:
+            return True, 0, set()
+        key = (id(frame), id(expression))
+        analysis = cls.__analyses.get(key)
+        if analysis is not None and analysis[0] is frame and analysis[1] is expression:
+            return analysis[2], analysis[3], set()
+        operation_name, arguments = split(expression)
+        if operation_name in ("get", "function"):
+            return True, 1, set()
+        pure = operation_name != "set"
+        cost = 1
+        assumed = set()
+        if operation_name == "power" and len(arguments) == 2 and isinstance(arguments[1], int):
+            cost += abs(arguments[1])
+        if operation_name == "call":
+            try:
+                func = frame.get(arguments[0])
+            except KeyError:
+                func = None
+            if not isinstance(func, Function) or cls.__is_parameter(frame, arguments[0]):
+                pure = False
+            elif id(func) in functions and functions[id(func)] is None:
+                assumed.add(id(func))
+            else:
+                if id(func) not in functions:
+                    functions[id(func)] = None
+                    body_pure, body_cost, body_assumed = cls.__analyze(func.frame, func.body, functions)
+                    functions[id(func)] = (body_pure, body_cost, body_assumed - {id(func)})
+                body_pure, body_cost, body_assumed = functions[id(func)]
+                pure = pure and body_pure
+                cost += body_cost
+                assumed |= body_assumed
+            arguments = arguments[1:]
+        for arg in arguments:
+            arg_pure, arg_cost, arg_assumed = cls.__analyze(frame, arg, functions)
+            pure = pure and arg_pure
+            cost += arg_cost
+            assumed |= arg_assumed
+        if not assumed:
+            cls.__analyses[key] = (frame, expression, pure, cost)
+        return pure, cost, assumed
+
+    @staticmethod
+    def __is_parameter(frame: Frame, name: str) -> bool:
+        """
+        Checks whether a name resolves to a parameter of a function. Its value depends on the arguments of the current
+        call (e.g. a function passed to a higher-order function), so calls through it can not be resolved statically.
+
+        Args:
+            frame (Frame): The frame in which the name would be looked up.
+            name (str): The name to resolve.
+
+        Returns:
+            bool: True if the name is a parameter of the function owning the frame or one of its parent frames, False otherwise.
+        """
+        while frame is not None:
+            if name in frame.parameters:
+                return True
+            if name in frame.environment:
+                return False
+            frame = frame.parent
+        return False
+
+    @classmethod
+    def rebind(cls, frame: Frame, name: str, value: any) -> None:
+        """
+        Drops all remembered analyses (see 'analyze') before a variable is bound to a function or a function is
+        rebound or shadowed, since calls may resolve to a different function afterwards.
+
+        Args:
+            frame (Frame): The frame in which the variable is about to be bound.
+            name (str): The name of the variable.
+            value (any): The value about to be bound.
+
+        Returns:
+            None
+        """
+        try:
+            previous = frame.get(name)
+        except KeyError:
+            previous = None
+        if isinstance(value, Function) or isinstance(previous, Function):
+            cls.__analyses.clear()
+
+    @classmethod
+    def __pool(cls) -> "ProcessPoolExecutor":
+        """
+        Lazily starts the process pool.
+
+        Returns:
+            ProcessPoolExecutor: The process pool used to evaluate operands.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        if cls.__executor is None:
+            cls.__executor = ProcessPoolExecutor(max_workers=cls.workers)
+        return cls.__executor
+
+
 def do_add(frame: Frame, args: list) -> int:
     """
     Adds two evaluated values: a + b.
@@ -442,7 +676,22 @@ def do(frame: Frame, args: list) -> any:
     Returns:
         any: The result of the evaluated expression (or 'None' for 'set').
     """
+    operation_name, arguments = split(args)
+    if Parallel.enabled and operation_name in Parallel.BINARY_OPERATIONS:
+        arguments = Parallel.evaluate(frame, arguments)
+    return operations(operation_name)(frame, arguments)
+
+
+def split(args: list) -> tuple[str, list]:
+    """
+    Splits an expression into its operation name and its arguments. Infix expressions are converted to prefix form.
 
+    Args:
+        args (list): A list containing the operation name, either as a prefix (first element) or an infix (second element), followed by the expression.
+
+    Returns:
+        tuple[str, list]: The name of the operation and the list of its arguments.
+    """
     if args[1] in ["+", "-", "*", "/", "^", "AND", "OR", "XOR"]:
         operation_name = ""
         match args[1]:
@@ -464,9 +713,7 @@ def do(frame: Frame, args: list) -> any:
                 operation_name = "XOR"
         args = [operation_name, args[0], args[2]]
 
-    operation_name = args[0]
-    arguments = args[1:]
-    return operations(operation_name)(frame, arguments)
+    return args[0], args[1:]
 
 
 def operations(operation_name: str) -> callable:
@@ -507,7 +754,7 @@ def load_lgl(file_name: str) -> list:
 def main() -> None:
     """
     Main entry point for the LGL interpreter. Parses command-line arguments, loads the LGL code,
-    executes it, and optionally writes a trace log if specified.
+    executes it (optionally evaluating independent operands in parallel), and optionally writes a trace log if specified.
     """
     import argparse
 
@@ -516,11 +763,30 @@ def main() -> None:
         "filename", type=str, help="Path to file containing LGL code (.gsc file)"
     )
     arg_parser.add_argument("--trace", type=str, help="Path to store trace log")
+    arg_parser.add_argument(
+        "--parallel",
+        type=int,
+        nargs="?",
+        const=0,
+        help="Evaluate independent operands on a pool of N worker processes (defaults to the number of CPUs)",
+    )
+    arg_parser.add_argument(
+        "--parallel-threshold",
+        type=int,
+        default=Parallel.threshold,
+        help="Minimal estimated cost of both operands to evaluate them in parallel",
+    )
     args = arg_parser.parse_args()
 
+    if args.parallel is not None:
+        Parallel.enable(args.parallel or None, args.parallel_threshold)
+
     global_frame = Frame()
     program = load_lgl(args.filename)
-    result = do(global_frame, program)
+    try:
+        result = do(global_frame, program)
+    finally:
+        Parallel.shutdown()
     print(result)
 
     if args.trace:
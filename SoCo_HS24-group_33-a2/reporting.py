@@ -1,35 +1,256 @@
-import sys
 import csv
+import io
+import json
+import math
+import os
 from datetime import datetime, timedelta
 
 BLUE = "\033[36m"
 RESET = "\033[0m"
 
+FORMATS = ["table", "json", "csv", "prometheus"]
+MICROSECOND = timedelta(microseconds=1)
+EXACT_LIMIT = 1000
+GROWTH = 1.01
+
+STATISTICS = ["calls", "total_ms", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+
 
 def parse_log(log_file: str) -> dict:
     """
-    Parses a log file generated by the 'Trace.write' from 'lgl_interpreter' to extract function call data. Sort the rows of the .csv (excluding the header) according to the function ID and then iterate through each call pair recording the function call amount and the total time spent on each function type (identified by name).
+    Parses a log file generated by the 'Trace.write' from 'lgl_interpreter' to extract function call data. The rows of the .csv (excluding the header) are streamed, and each 'stop' event is paired with the pending 'start' event of the same function ID, recording the function call amount, the total time, the longest call and a histogram of call durations spent on each function type (identified by name). Only calls that have not stopped yet are kept in memory.
 
     Args:
         log_file (str): Path to the log file containing function call events.
 
     Returns:
-        dict: A dictionary with the function name as key and another dictionary a the value containing the number of calls and the total time as keys.
+        dict: A dictionary with the function name as key and another dictionary a the value containing the number of calls, the total time, the longest call and the duration histogram (see 'bucket') as keys.
     """
-    with open(log_file, "r") as file:
-        rows = sorted(list(csv.reader(file))[1:], key=lambda x: x[0])
-        functions = {}
-        for i in range(0, len(rows), 2):
-            name = rows[i][2]
+    functions = {}
+    pending = {}
+    with open(log_file, "r", newline="") as file:
+        reader = csv.reader(file)
+        next(reader, None)
+        for id, timestamp, name, event in reader:
+            if event == "start":
+                pending.setdefault(id, []).append(datetime.fromisoformat(timestamp))
+                continue
+            start = pending[id].pop()
+            if not pending[id]:
+                del pending[id]
+            duration = abs(datetime.fromisoformat(timestamp) - start)
             if name not in functions:
-                functions[name] = {"calls": 0, "total_time": timedelta(0)}
-            start = datetime.strptime(rows[i][1], "%Y-%m-%d %H:%M:%S.%f")
-            stop = datetime.strptime(rows[i + 1][1], "%Y-%m-%d %H:%M:%S.%f")
-            functions[name]["calls"] += 1
-            functions[name]["total_time"] += abs(stop - start)
+                functions[name] = {"calls": 0, "total_time": timedelta(0), "max_time": timedelta(0), "histogram": {}}
+            stats = functions[name]
+            stats["calls"] += 1
+            stats["total_time"] += duration
+            stats["max_time"] = max(stats["max_time"], duration)
+            key = bucket(duration // MICROSECOND)
+            stats["histogram"][key] = stats["histogram"].get(key, 0) + 1
     return functions
 
 
+def bucket(microseconds: int) -> int:
+    """
+    Maps a call duration to its histogram bucket. Durations below 'EXACT_LIMIT' microseconds get their own bucket, longer durations are grouped into logarithmic buckets growing by 'GROWTH', which bounds the relative error of the reported percentiles to 1%.
+
+    Args:
+        microseconds (int): The duration of a call in microseconds.
+
+    Returns:
+        int: The lower bound of the bucket in microseconds.
+    """
+    if microseconds < EXACT_LIMIT:
+        return microseconds
+    return int(GROWTH ** math.floor(math.log(microseconds, GROWTH)))
+
+
+def merge(total: dict, data: dict) -> dict:
+    """
+    Merges the function call data of one log file into the data accumulated so far.
+
+    Args:
+        total (dict): The accumulated function call data, updated in place.
+        data (dict): The function call data parsed from one log file by 'parse_log'.
+
+    Returns:
+        dict: The updated accumulated function call data.
+    """
+    for name, stats in data.items():
+        if name not in total:
+            total[name] = {"calls": 0, "total_time": timedelta(0), "max_time": timedelta(0), "histogram": {}}
+        merged = total[name]
+        merged["calls"] += stats["calls"]
+        merged["total_time"] += stats["total_time"]
+        merged["max_time"] = max(merged["max_time"], stats["max_time"])
+        for key, count in stats["histogram"].items():
+            merged["histogram"][key] = merged["histogram"].get(key, 0) + count
+    return total
+
+
+def aggregate_logs(log_files: list[str], workers: int = None) -> dict:
+    """
+    Parses many log files on a process pool and merges their function call data in the order of the files, so that the result (including the order of the functions) does not depend on which worker finishes first.
+    At most twice as many files as there are workers are submitted ahead of the next file to merge, so that only a bounded number of the compact per-file results are ever held in memory.
+
+    Args:
+        log_files (list[str]): The paths to the log files.
+        workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+
+    Returns:
+        dict: The combined function call data of all log files, in the same shape as returned by 'parse_log'.
+    """
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    total = {}
+    if len(log_files) == 1:
+        return merge(total, parse_log(log_files[0]))
+    window = 2 * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = deque()
+        for log_file in log_files:
+            futures.append(executor.submit(parse_log, log_file))
+            if len(futures) >= window:
+                merge(total, futures.popleft().result())
+        while futures:
+            merge(total, futures.popleft().result())
+    return total
+
+
+def find_logs(paths: list[str]) -> list[str]:
+    """
+    Expands the given paths into a list of log files. Directories are replaced by the .csv files they contain.
+
+    Args:
+        paths (list[str]): Paths to log files or to directories containing log files.
+
+    Returns:
+        list[str]: The paths to all log files.
+    """
+    log_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            log_files += sorted(
+                os.path.join(path, filename) for filename in os.listdir(path) if filename.endswith(".csv")
+            )
+        else:
+            log_files.append(path)
+    return log_files
+
+
+def percentile(histogram: dict, q: float) -> float:
+    """
+    Computes the q-th percentile of a duration histogram using the nearest-rank method.
+
+    Args:
+        histogram (dict): The number of calls per bucket, as built by 'parse_log'.
+        q (float): The percentile to compute, between 0 and 100.
+
+    Returns:
+        float: The lower bound of the bucket containing the q-th percentile in milliseconds, or 0.0 if the histogram is empty.
+    """
+    calls = sum(histogram.values())
+    if not calls:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * calls))
+    seen = 0
+    for key in sorted(histogram):
+        seen += histogram[key]
+        if seen >= rank:
+            return key / 1000
+    return 0.0
+
+
+def summarize(data: dict) -> dict:
+    """
+    Computes the per-function statistics reported by every output format.
+
+    Args:
+        data (dict): A dictionary with function call data parsed from the log file by 'parse_log'.
+
+    Returns:
+        dict: A dictionary with the function name as key and a dictionary with the statistics named in 'STATISTICS' as value. All times are in milliseconds, rounded to the microsecond resolution of the trace log.
+    """
+    summary = {}
+    for function_name, stats in data.items():
+        total_time = stats["total_time"].total_seconds() * 1000
+        summary[function_name] = {
+            "calls": stats["calls"],
+            "total_ms": round(total_time, 3),
+            "mean_ms": round(total_time / stats["calls"], 3),
+            "p50_ms": round(percentile(stats["histogram"], 50), 3),
+            "p95_ms": round(percentile(stats["histogram"], 95), 3),
+            "p99_ms": round(percentile(stats["histogram"], 99), 3),
+            "max_ms": round(stats["max_time"].total_seconds() * 1000, 3),
+        }
+    return summary
+
+
+def format_json(summary: dict) -> str:
+    """
+    Formats the function statistics as a JSON document.
+
+    Args:
+        summary (dict): The function statistics computed by 'summarize'.
+
+    Returns:
+        str: A JSON object with the function name as key and its statistics as value.
+    """
+    return json.dumps(summary, indent=4)
+
+
+def format_csv(summary: dict) -> str:
+    """
+    Formats the function statistics as CSV with one row per function.
+
+    Args:
+        summary (dict): The function statistics computed by 'summarize'.
+
+    Returns:
+        str: The CSV document including a header row.
+    """
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(["function_name"] + STATISTICS)
+    for function_name, stats in summary.items():
+        writer.writerow([function_name] + [stats[key] for key in STATISTICS])
+    return output.getvalue().rstrip("\n")
+
+
+def format_prometheus(summary: dict) -> str:
+    """
+    Formats the function statistics in the Prometheus text exposition format. Durations are exported in seconds as a summary with quantiles, and the maximum duration as a separate gauge.
+
+    Args:
+        summary (dict): The function statistics computed by 'summarize'.
+
+    Returns:
+        str: The metrics in Prometheus text format.
+    """
+
+    def label(function_name: str) -> str:
+        escaped = function_name.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        return f'function="{escaped}"'
+
+    lines = [
+        "# HELP lgl_function_duration_seconds Duration of LGL function calls.",
+        "# TYPE lgl_function_duration_seconds summary",
+    ]
+    for function_name, stats in summary.items():
+        for quantile, key in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms")):
+            lines.append(
+                f'lgl_function_duration_seconds{{{label(function_name)},quantile="{quantile}"}} {stats[key] / 1000}'
+            )
+        lines.append(f"lgl_function_duration_seconds_sum{{{label(function_name)}}} {stats['total_ms'] / 1000}")
+        lines.append(f"lgl_function_duration_seconds_count{{{label(function_name)}}} {stats['calls']}")
+    lines.append("# HELP lgl_function_duration_max_seconds Longest duration of an LGL function call.")
+    lines.append("# TYPE lgl_function_duration_max_seconds gauge")
+    for function_name, stats in summary.items():
+        lines.append(f"lgl_function_duration_max_seconds{{{label(function_name)}}} {stats['max_ms'] / 1000}")
+    return "\n".join(lines)
+
+
 def print_results(data: dict) -> None:
     """
     Prints formatted function call statistics, including the name, the number of calls, total time,
@@ -57,12 +278,32 @@ def print_results(data: dict) -> None:
 
 def main() -> None:
     """
-    Main entry point for reporting. Expects a log file as a command-line argument
-    and outputs formatted function statistics to the console.
+    Main entry point for reporting. Expects one or more log files (or directories containing them)
+    as command-line arguments and outputs the combined function statistics to the console, either as
+    a formatted table or in a machine-readable format selected with '--format'.
     """
-    assert len(sys.argv) == 2
-    log_file = sys.argv[1]
-    print_results(parse_log(log_file))
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="LGL trace reporting")
+    arg_parser.add_argument(
+        "log_files", type=str, nargs="+", help="Paths to trace logs (.csv files) or directories containing them"
+    )
+    arg_parser.add_argument("--format", choices=FORMATS, default="table", help="Output format")
+    arg_parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    args = arg_parser.parse_args()
+
+    log_files = find_logs(args.log_files)
+    assert log_files, "No trace logs found"
+    data = aggregate_logs(log_files, args.workers)
+    match args.format:
+        case "table":
+            print_results(data)
+        case "json":
+            print(format_json(summarize(data)))
+        case "csv":
+            print(format_csv(summarize(data)))
+        case "prometheus":
+            print(format_prometheus(summarize(data)))
 
 
 if __name__ == "__main__":
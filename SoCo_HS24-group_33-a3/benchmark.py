@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+import time
+from record import Record
+from index import Index
+
+MAGENTA = "\033[35m"
+GREEN = "\033[32m"
+RESET = "\033[0m"
+
+
+def create_tree(directory: str, files: int, size: int) -> list[str]:
+    """
+    Create a working directory with the provided number of files of random content, spread over subdirectories of 100 files each.
+
+    Args:
+        directory (str): The directory in which to create the files.
+        files (int): The number of files to create.
+        size (int): The size of each file in bytes.
+
+    Returns:
+        list[str]: The paths of the created files.
+    """
+    paths = []
+    for i in range(files):
+        subdirectory = os.path.join(directory, f"dir_{i // 100}")
+        os.makedirs(subdirectory, exist_ok=True)
+        path = os.path.join(subdirectory, f"file_{i}.txt")
+        with open(path, "wb") as file:
+            file.write(os.urandom(size))
+        paths.append(path)
+    return paths
+
+
+def benchmark_hash_files(paths: list[str], workers: list[int], size: int) -> None:
+    """
+    Hash the provided files with 'Record.hash_files' once per number of workers and print the throughput and the speedup over a single worker.
+
+    Args:
+        paths (list[str]): The paths of the files to hash.
+        workers (list[int]): The numbers of workers to measure.
+        size (int): The size of each file in bytes.
+
+    Returns:
+        None
+    """
+    print(f"{MAGENTA}{'Workers':<10}{'Time':<12}{'Files/s':<14}{'MB/s':<10}{'Speedup'}{RESET}")
+    expected = None
+    baseline = None
+    for count in workers:
+        start_time = time.perf_counter()
+        hashes = Record.hash_files(paths, count)
+        elapsed_time = time.perf_counter() - start_time
+        expected = expected or hashes
+        assert hashes == expected, f"Hashes with {count} workers differ"
+        baseline = baseline or elapsed_time
+        throughput = len(paths) * size / elapsed_time / 2**20
+        print(
+            f"{count:<10}{GREEN}{elapsed_time:<12.3f}{len(paths) / elapsed_time:<14,.0f}{throughput:<10,.1f}{baseline / elapsed_time:.2f}x{RESET}"
+        )
+
+
+def benchmark_index(directory: str, paths: list[str]) -> None:
+    """
+    Hash the provided files with 'Index.hash_files' without an index, again without any change, and after modifying 1% of the files, and print the time of each run.
+
+    Args:
+        directory (str): The working directory containing the files, in which the '.tig/' folder is created.
+        paths (list[str]): The paths of the files to hash.
+
+    Returns:
+        None
+    """
+    working_dir = os.getcwd()
+    os.chdir(directory)
+    try:
+        os.makedirs(".tig", exist_ok=True)
+        print(f"{MAGENTA}{'Index':<24}{'Time'}{RESET}")
+        for name in ["no index", "unchanged", "1% modified"]:
+            if name == "1% modified":
+                for path in paths[:: max(1, len(paths) // 100)]:
+                    with open(path, "ab") as file:
+                        file.write(b"changed")
+            start_time = time.perf_counter()
+            Index.hash_files(paths)
+            print(f"{name:<24}{GREEN}{(time.perf_counter() - start_time) * 1000:.3f}ms{RESET}")
+    finally:
+        os.chdir(working_dir)
+
+
+if __name__ == "__main__":
+    """
+    Benchmark the hashing of a working directory with 'Record.hash_files' across different numbers of workers, and with the stat-based 'Index'.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark file hashing of tig")
+    parser.add_argument("-n", "--files", type=int, default=10000, help="Number of files in the working directory")
+    parser.add_argument("--size", type=int, default=64, help="Size of each file in KB")
+    parser.add_argument(
+        "-w", "--workers", type=int, nargs="+", default=None, help="Numbers of workers to measure (default: 1, 2, 4, ...)"
+    )
+    args = parser.parse_args()
+
+    workers = args.workers or [2**i for i in range((2 * (os.cpu_count() or 1)).bit_length())]
+    directory = tempfile.mkdtemp()
+    try:
+        paths = create_tree(directory, args.files, args.size * 1024)
+        benchmark_hash_files(paths, workers, args.size * 1024)
+        benchmark_index(directory, paths)
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,73 @@
+import os
+import json
+from record import Record
+
+
+class Index:
+    """
+    Manages the `.index.json` file, which caches the hash of each file in the working directory together with its size, modification time and inode.
+    Files whose stat data has not changed since they were last hashed are not read again.
+    """
+
+    INDEX_FILE = os.path.join(".tig", ".index.json")
+
+    @staticmethod
+    def hash_files(filenames: list[str]) -> list[str]:
+        """
+        Get the hashes of the provided files, only hashing files (see 'Record.hash_files') whose size, modification time or inode differ from the '.index.json' file.
+        Files modified no earlier than the last write of the '.index.json' file may have changed again without their stat data changing, so they are hashed again as well (like racily clean files in git).
+        Afterwards, the '.index.json' file is updated to contain exactly the provided files.
+
+        Args:
+            filenames (list[str]): The names of the files for which to get the hashes.
+
+        Returns:
+            list[str]: The hashes of the files, in the same order as the filenames.
+        """
+        written, entries = Index.__read_json()
+        stats = []
+        changed = []
+        for filename in filenames:
+            stat = os.stat(filename)
+            stats.append((stat.st_size, stat.st_mtime_ns, stat.st_ino))
+            entry = entries.get(filename)
+            if entry is None or tuple(entry[:3]) != stats[-1] or stat.st_mtime_ns >= written:
+                changed.append(filename)
+        hashes = dict(zip(changed, Record.hash_files(changed)))
+        files = {}
+        for filename, stat in zip(filenames, stats):
+            files[filename] = [*stat, hashes[filename] if filename in hashes else entries[filename][3]]
+        if changed or files.keys() != entries.keys():
+            Index.__write_json(files)
+        return [files[filename][3] for filename in filenames]
+
+    @staticmethod
+    def __read_json() -> tuple[int, dict]:
+        """
+        Return the entries of the '.index.json' file and the time it was last modified.
+
+        Returns:
+            tuple[int, dict]: The modification time of the '.index.json' file in nanoseconds, and a dictionary with the filename as key and a list of its size, modification time, inode and hash as value.
+            If the file does not exist or cannot be read, returns no entries.
+        """
+        if os.path.exists(Index.INDEX_FILE):
+            try:
+                with open(Index.INDEX_FILE, "r") as file:
+                    return os.fstat(file.fileno()).st_mtime_ns, json.load(file)
+            except ValueError:
+                pass
+        return 0, {}
+
+    @staticmethod
+    def __write_json(files: dict) -> None:
+        """
+        Write the entries to the '.index.json' file.
+
+        Args:
+            files (dict): A dictionary with the filename as key and a list of its size, modification time, inode and hash as value.
+
+        Returns:
+            None
+        """
+        with open(Index.INDEX_FILE, "w") as file:
+            json.dump(files, file)
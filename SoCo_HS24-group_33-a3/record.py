@@ -1,4 +1,5 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 
 class Record:
@@ -11,6 +12,7 @@ class Record:
     STAGED = 2
     COMMITED = 3
     REPRESENT = {0: "untracked", 1: "modified", 2: "staged", 3: "commited"}
+    BUFFER_SIZE = 1024 * 1024
 
     def __init__(self, filename: str, status: int, hash: str = None) -> None:
         """
@@ -53,7 +55,7 @@ class Record:
     @staticmethod
     def get_hash(filename: str) -> str:
         """
-        Get the SHA-1 hash of a specific file in the current working directory. Reads the file in chunks of 4 KB to compute the hash.
+        Get the SHA-1 hash of a specific file in the current working directory. Reads the file in chunks of 'BUFFER_SIZE' (1 MB) to compute the hash.
 
         Args:
             filename (str): The name of the file for which to compute the hash.
@@ -66,6 +68,24 @@ class Record:
         absolute_path = os.path.abspath(filename)
         sha1 = hashlib.sha1()
         with open(absolute_path, "rb") as file:
-            while chunk := file.read(4096):
+            while chunk := file.read(Record.BUFFER_SIZE):
                 sha1.update(chunk)
         return sha1.hexdigest()[:8]
+
+    @staticmethod
+    def hash_files(filenames: list[str], workers: int = None) -> list[str]:
+        """
+        Get the hashes of many files at once (see 'get_hash'). The files are hashed on a pool of threads, as reading a file and computing
+        its SHA-1 hash both release the global interpreter lock, so large working directories are hashed on all cores.
+
+        Args:
+            filenames (list[str]): The names of the files for which to compute the hashes.
+            workers (int, optional): The number of threads. Defaults to the default of 'ThreadPoolExecutor'.
+
+        Returns:
+            list[str]: The hashes of the files, in the same order as the filenames.
+        """
+        if workers == 1 or len(filenames) < 2:
+            return [Record.get_hash(filename) for filename in filenames]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(Record.get_hash, filenames))
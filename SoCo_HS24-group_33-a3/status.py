@@ -1,6 +1,7 @@
 import os
 import json
 from record import Record
+from index import Index
 
 
 class Status:
@@ -205,15 +206,16 @@ class Status:
         """
         Get the records of each file in the current working directory as a Record instance.
         Each record is initalized with the status UNTRACKED, as all other files are already present in the '.status.json'
+        The files are collected first and then hashed together, only reading files that changed since the last command (see 'Index.hash_files').
 
         Returns:
             list[Record]: A list of records representing the files in the current working directory.
         """
 
-        records = []
+        paths = []
         for root, dirs, filenames in os.walk("."):
             dirs[:] = [d for d in dirs if d not in (".tig")]
             for filename in filenames:
-                relative_path = os.path.relpath(os.path.join(root, filename), start=".")
-                records.append(Record(relative_path, 0))
-        return records
+                paths.append(os.path.relpath(os.path.join(root, filename), start="."))
+        hashes = Index.hash_files(paths)
+        return [Record(path, 0, hash) for path, hash in zip(paths, hashes)]